@@ -334,11 +334,12 @@ async def export_analytics(
             trends = get_pipeline_trends(start=start, end=end, interval="daily")
             writer.writerow([])
             writer.writerow(["Date", "Ingested", "Published", "Templates"])
-            for i, date in enumerate(trends["ingested"]):
-                ingested_count = trends["ingested"][i]["count"] if i < len(trends["ingested"]) else 0
-                published_count = trends["published"][i]["count"] if i < len(trends["published"]) else 0
-                template_count = trends["templates"][i]["count"] if i < len(trends["templates"]) else 0
-                writer.writerow([date["date"], ingested_count, published_count, template_count])
+            published_by_date = dict(zip(trends["published"]["dates"], trends["published"]["counts"]))
+            templates_by_date = dict(zip(trends["templates"]["dates"], trends["templates"]["counts"]))
+            for date, ingested_count in zip(trends["ingested"]["dates"], trends["ingested"]["counts"]):
+                published_count = published_by_date.get(date, 0)
+                template_count = templates_by_date.get(date, 0)
+                writer.writerow([date, ingested_count, published_count, template_count])
                 
         else:
             # Security export
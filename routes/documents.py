@@ -16,7 +16,7 @@ from models import Document, DocumentSourceEnum, OCRStatusEnum, FundingOpportuni
 from schemas import CreateProposalTemplateRequest, ProposalTemplateResponse
 from utils.auth import require_admin_auth
 from services.storage import storage_service, StorageError
-from services.pdf_extract import pdf_extractor, PDFExtractionError, PDFValidationError
+from services.pdf_extract import get_pdf_extractor, PDFExtractionError, PDFValidationError
 from services.pdf_to_gold import pdf_to_gold_parser, ParsedOpportunity, PDFParseError
 
 # Rate limiting
@@ -51,7 +51,7 @@ class DocumentService:
                 return self._build_document_response(existing_doc, db)
             
             # Download and extract PDF
-            extract_result = pdf_extractor.extract_from_url(url)
+            extract_result = get_pdf_extractor().extract_from_url(url)
             
             # Parse to gold standard
             parsed_opportunity = pdf_to_gold_parser.parse_to_gold_standard(extract_result, url)
@@ -144,7 +144,7 @@ class DocumentService:
                 return self._build_document_response(existing_doc, db)
             
             # Extract text from PDF
-            extract_result = pdf_extractor.extract_from_bytes(pdf_bytes, file.filename)
+            extract_result = get_pdf_extractor().extract_from_bytes(pdf_bytes, file.filename)
             
             # Parse to gold standard
             parsed_opportunity = pdf_to_gold_parser.parse_to_gold_standard(extract_result, file.filename)
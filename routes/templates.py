@@ -116,7 +116,8 @@ class TemplateService:
             
             # Generate DOCX and PDF
             content_model, docx_bytes, pdf_bytes = self.generator.generate_template(
-                opportunity_data, sections_data, funder_notes, hints
+                opportunity_data, sections_data, funder_notes, hints,
+                use_cache=not force_regenerate
             )
             
             # Save files to storage
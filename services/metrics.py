@@ -5,10 +5,11 @@ Provides efficient SQLAlchemy queries with in-process caching
 import os
 import time
 import hashlib
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, text
+from sqlalchemy import func, and_, desc, text, event
 from sqlalchemy.sql import text
 
 from db import get_db
@@ -17,9 +18,22 @@ from models import (
     IngestionRun, SecurityEvent, Source, ParsedDataFeedback, AdminUser
 )
 
-# Simple in-process cache with TTL (60s, disabled if TEST_MODE=true)
+# Simple in-process cache with TTL (disabled if TEST_MODE=true).
+# Writes in this process invalidate affected entries via the after_flush
+# listener below; writes from other workers, services or raw SQL are not
+# seen, so the TTL bounds their staleness and stays short by default.
 _cache = {}
-_cache_ttl = 60
+try:
+    _cache_ttl = int(os.getenv("METRICS_CACHE_TTL") or 60)
+except ValueError:
+    _cache_ttl = 60  # malformed value: keep the default rather than fail at import
+
+# Cache key prefixes to drop when rows in these tables change
+_PIPELINE_TABLES = {"funding_opportunities", "proposal_templates", "parsed_data_feedback",
+                    "sources", "ingestion_runs"}
+_PIPELINE_PREFIXES = ("pipeline_", "qa_", "source_")
+_SECURITY_TABLES = {"security_events"}
+_SECURITY_PREFIXES = ("security_",)
 
 def _get_cache_key(prefix: str, **kwargs) -> str:
     """Generate cache key from prefix and kwargs"""
@@ -46,6 +60,27 @@ def _set_cached(key: str, value: Any) -> None:
     
     _cache[key] = (value, time.time())
 
+def _invalidate_prefixes(prefixes: tuple) -> None:
+    """Drop cached entries whose key starts with any of the prefixes"""
+    for key in list(_cache):
+        if key.startswith(prefixes):
+            _cache.pop(key, None)
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_on_flush(session, flush_context) -> None:
+    """Invalidate only the metrics namespaces touched by this flush"""
+    if not _cache:
+        return
+    
+    touched = {
+        getattr(obj, "__tablename__", None)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    }
+    if touched & _PIPELINE_TABLES:
+        _invalidate_prefixes(_PIPELINE_PREFIXES)
+    if touched & _SECURITY_TABLES:
+        _invalidate_prefixes(_SECURITY_PREFIXES)
+
 def _get_date_range(start: Optional[str] = None, end: Optional[str] = None) -> tuple:
     """Parse date range parameters"""
     if not start:
@@ -58,6 +93,13 @@ def _get_date_range(start: Optional[str] = None, end: Optional[str] = None) -> t
     
     return start_dt, end_dt
 
+def _to_columns(rows) -> Dict[str, List[Any]]:
+    """Convert (date, count) rows into parallel lists for Chart.js"""
+    return {
+        "dates": [row.date.strftime("%Y-%m-%d") for row in rows],
+        "counts": [row.count for row in rows]
+    }
+
 def _hash_ip(ip: str) -> str:
     """Hash IP address for privacy"""
     return hashlib.sha256(ip.encode()).hexdigest()[:16]
@@ -183,10 +225,11 @@ def get_pipeline_trends(start: Optional[str] = None, end: Optional[str] = None,
             )
         ).group_by(template_date_trunc).order_by(template_date_trunc).all()
         
+        # Columnar output: one list per axis instead of a dict per point
         result = {
-            "ingested": [{"date": row.date.strftime("%Y-%m-%d"), "count": row.count} for row in ingested_trends],
-            "published": [{"date": row.date.strftime("%Y-%m-%d"), "count": row.count} for row in published_trends],
-            "templates": [{"date": row.date.strftime("%Y-%m-%d"), "count": row.count} for row in template_trends]
+            "ingested": _to_columns(ingested_trends),
+            "published": _to_columns(published_trends),
+            "templates": _to_columns(template_trends)
         }
         
         _set_cached(cache_key, result)
@@ -274,6 +317,36 @@ def get_qa_metrics(start: Optional[str] = None, end: Optional[str] = None) -> Di
 
 # Security Analytics Functions
 
+def _load_security_window(db: Session, start_dt: datetime, end_dt: datetime) -> List[tuple]:
+    """Load (event_type, day, ip_hashed, role, count) aggregates for the window once.
+    
+    The security KPI, trend and breakdown endpoints all roll up these groups, so
+    they share this cached window. It is aggregated in SQL and carries no user
+    emails; the per-user breakdown is queried separately and only its top 10 kept.
+    """
+    cache_key = _get_cache_key("security_window", start=start_dt.date(), end=end_dt.date())
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        return cached
+    
+    day = func.date_trunc('day', SecurityEvent.created_at)
+    rows = db.query(
+        SecurityEvent.event_type,
+        day.label('day'),
+        SecurityEvent.ip_hashed,
+        SecurityEvent.role,
+        func.count(SecurityEvent.id).label('count')
+    ).filter(
+        and_(
+            SecurityEvent.created_at >= start_dt,
+            SecurityEvent.created_at < end_dt
+        )
+    ).group_by(SecurityEvent.event_type, day, SecurityEvent.ip_hashed, SecurityEvent.role).all()
+    
+    window = [tuple(row) for row in rows]
+    _set_cached(cache_key, window)
+    return window
+
 def get_security_kpis(start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
     """Get security KPIs for the specified date range"""
     cache_key = _get_cache_key("security_kpis", start=start, end=end)
@@ -284,19 +357,12 @@ def get_security_kpis(start: Optional[str] = None, end: Optional[str] = None) ->
     start_dt, end_dt = _get_date_range(start, end)
     
     with get_db() as db:
-        # Count events by type
-        event_counts = db.query(
-            SecurityEvent.event_type,
-            func.count(SecurityEvent.id).label('count')
-        ).filter(
-            and_(
-                SecurityEvent.created_at >= start_dt,
-                SecurityEvent.created_at < end_dt
-            )
-        ).group_by(SecurityEvent.event_type).all()
+        window = _load_security_window(db, start_dt, end_dt)
         
-        # Convert to dict for easy access
-        counts = {row.event_type: row.count for row in event_counts}
+        # Count events by type
+        counts = Counter()
+        for event_type, _, _, _, count in window:
+            counts[event_type] += count
         
         result = {
             "login_success": counts.get("login_success", 0),
@@ -324,31 +390,24 @@ def get_security_trends(start: Optional[str] = None, end: Optional[str] = None,
     start_dt, end_dt = _get_date_range(start, end)
     
     with get_db() as db:
-        if interval == "daily":
-            date_trunc = func.date_trunc('day', SecurityEvent.created_at)
-        else:  # weekly
-            date_trunc = func.date_trunc('week', SecurityEvent.created_at)
+        window = _load_security_window(db, start_dt, end_dt)
         
-        # Get trends for login events
-        trends = db.query(
-            date_trunc.label('date'),
-            SecurityEvent.event_type,
-            func.count(SecurityEvent.id).label('count')
-        ).filter(
-            and_(
-                SecurityEvent.event_type.in_(["login_success", "login_failure"]),
-                SecurityEvent.created_at >= start_dt,
-                SecurityEvent.created_at < end_dt
-            )
-        ).group_by(date_trunc, SecurityEvent.event_type).order_by(date_trunc).all()
+        # Bucket login events by day (or ISO week start, matching date_trunc('week'))
+        trends = Counter()
+        for event_type, day, _, _, count in window:
+            if event_type not in ("login_success", "login_failure"):
+                continue
+            if interval != "daily":
+                day = day - timedelta(days=day.weekday())
+            trends[(day.strftime("%Y-%m-%d"), event_type)] += count
         
-        result = []
-        for row in trends:
-            result.append({
-                "date": row.date.strftime("%Y-%m-%d"),
-                "event_type": row.event_type,
-                "count": row.count
-            })
+        # Pivot into parallel lists aligned on dates
+        dates = sorted({date_str for date_str, _ in trends})
+        result = {
+            "dates": dates,
+            "success": [trends[(d, "login_success")] for d in dates],
+            "failure": [trends[(d, "login_failure")] for d in dates]
+        }
         
         _set_cached(cache_key, result)
         return result
@@ -363,19 +422,18 @@ def get_security_breakdown(start: Optional[str] = None, end: Optional[str] = Non
     start_dt, end_dt = _get_date_range(start, end)
     
     with get_db() as db:
-        # Top offending IPs (already hashed)
-        ip_breakdown = db.query(
-            SecurityEvent.ip_hashed,
-            func.count(SecurityEvent.id).label('count')
-        ).filter(
-            and_(
-                SecurityEvent.event_type.in_(["login_failure", "rate_limit_exceeded", "forbidden_access"]),
-                SecurityEvent.created_at >= start_dt,
-                SecurityEvent.created_at < end_dt
-            )
-        ).group_by(SecurityEvent.ip_hashed).order_by(desc('count')).limit(10).all()
+        window = _load_security_window(db, start_dt, end_dt)
         
-        # Top offending users
+        # Single pass over the window for IP and role buckets
+        ip_counts = Counter()
+        role_counts = Counter()
+        for event_type, _, ip_hashed, role, count in window:
+            if event_type in ("login_failure", "rate_limit_exceeded", "forbidden_access"):
+                ip_counts[ip_hashed] += count
+            if event_type == "login_success" and role is not None:
+                role_counts[role] += count
+        
+        # Top offending users, straight from SQL so per-user rows are never held in the cache
         user_breakdown = db.query(
             SecurityEvent.user_email,
             func.count(SecurityEvent.id).label('count')
@@ -388,23 +446,10 @@ def get_security_breakdown(start: Optional[str] = None, end: Optional[str] = Non
             )
         ).group_by(SecurityEvent.user_email).order_by(desc('count')).limit(10).all()
         
-        # Role usage
-        role_breakdown = db.query(
-            SecurityEvent.role,
-            func.count(SecurityEvent.id).label('count')
-        ).filter(
-            and_(
-                SecurityEvent.event_type == "login_success",
-                SecurityEvent.role.isnot(None),
-                SecurityEvent.created_at >= start_dt,
-                SecurityEvent.created_at < end_dt
-            )
-        ).group_by(SecurityEvent.role).order_by(desc('count')).all()
-        
         result = {
-            "ip_breakdown": [{"ip_hashed": row.ip_hashed, "count": row.count, "event_types": ["security"]} for row in ip_breakdown],
+            "ip_breakdown": [{"ip_hashed": ip, "count": count, "event_types": ["security"]} for ip, count in ip_counts.most_common(10)],
             "user_breakdown": [{"user_email": row.user_email, "count": row.count, "event_types": ["login_failure"]} for row in user_breakdown],
-            "role_breakdown": [{"role": row.role, "count": row.count} for row in role_breakdown]
+            "role_breakdown": [{"role": role, "count": count} for role, count in role_counts.most_common()]
         }
         
         _set_cached(cache_key, result)
@@ -1,24 +1,40 @@
 import os
+import re
+import atexit
+import copy
+import contextlib
+import json
+import math
+import stat
 import logging
 import hashlib
 import tempfile
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+import statistics
+import functools
+import threading
+import uuid
+from importlib.util import find_spec
+from typing import Dict, Any, List, Optional, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
 from pathlib import Path
 import requests
 from urllib.parse import urlparse
 import fitz  # PyMuPDF
 from pdfminer.high_level import extract_text_to_fp
 from pdfminer.layout import LAParams
-from io import BytesIO, StringIO
-from PIL import Image
-import io
+try:
+    import pypdfium2 as pdfium  # Optional C-backed secondary engine
+except ImportError:
+    pdfium = None
+from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class TextBlock:
-    """Represents a block of extracted text with positioning"""
+    """Represents a block of extracted text with positioning (slotted: created per block)"""
     type: str  # 'text', 'heading', 'table', 'image'
     text: str
     bbox: Tuple[float, float, float, float]  # x0, y0, x1, y1
@@ -36,6 +52,13 @@ class ExtractResult:
     extraction_time_ms: float
     ocr_used: bool = False
 
+# ExtractResult.engine label for each OCR backend
+OCR_ENGINES = {
+    "textract": "ocr-textract",
+    "vision": "ocr-vision",
+    "self_hosted": "ocr-tesseract",
+}
+
 class PDFExtractionError(Exception):
     """Base exception for PDF extraction failures"""
     pass
@@ -44,6 +67,140 @@ class PDFValidationError(Exception):
     """Exception for PDF validation failures"""
     pass
 
+# Above this size, pooled extraction hands workers a temp file path rather than the bytes
+_SPILL_BYTES = 1024 * 1024
+
+# Key funding opportunity terms used to score extraction confidence
+KEY_TERMS = (
+    "eligibility", "deadline", "budget", "apply", "funding", "grant",
+    "opportunity", "application", "requirements", "criteria"
+)
+# One case-insensitive pass over the text instead of lower() + a scan per term
+_KEY_TERMS_RE = re.compile("|".join(re.escape(term) for term in KEY_TERMS), re.IGNORECASE)
+
+def _module_available(name: str) -> bool:
+    """Check whether a module can be imported without importing it"""
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Raised when a parent package (e.g. google.cloud) is missing
+        return False
+
+# Uncompressed page tree node dictionaries, e.g. << /Type /Pages /Kids [...] /Count 12 >>
+_PAGE_TREE_RE = re.compile(rb"<<[^<>]*?/Type\s*/Pages\b[^<>]*>>")
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+def _peek_page_count(pdf_bytes: bytes) -> Optional[int]:
+    """Estimate the page count from raw page tree nodes without parsing the PDF.
+    
+    The root node carries the largest /Count. Returns None when the page tree
+    is not visible (e.g. stored in a compressed object stream).
+    """
+    counts = []
+    for node in _PAGE_TREE_RE.finditer(pdf_bytes):
+        match = _COUNT_RE.search(node.group())
+        if match:
+            counts.append(int(match.group(1)))
+    return max(counts) if counts else None
+
+def ensure_private_dir(path: Path) -> bool:
+    """Create path as a 0700 directory and check nobody else can write to it.
+    
+    Returns False when the directory is not a real directory owned by this user
+    with no group/other permissions (e.g. pre-created by another user in /tmp).
+    """
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not create cache directory {path}: {e}")
+        return False
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        logger.warning(f"⚠️ Cache directory {path} is not private to this user; disk cache disabled")
+        return False
+    return True
+
+def _result_to_json(result: ExtractResult) -> str:
+    """Serialize an ExtractResult for the disk cache"""
+    return json.dumps(asdict(result))
+
+def _result_from_json(data: str) -> ExtractResult:
+    """Rebuild an ExtractResult written by _result_to_json"""
+    fields = json.loads(data)
+    fields["blocks"] = [
+        TextBlock(type=b["type"], text=b["text"], bbox=tuple(b["bbox"]), page=b["page"], confidence=b["confidence"])
+        for b in fields["blocks"]
+    ]
+    return ExtractResult(**fields)
+
+def _count_key_terms(text: str) -> int:
+    """Count how many distinct KEY_TERMS appear in text"""
+    return len({match.lower() for match in _KEY_TERMS_RE.findall(text)})
+
+def _extract_pages(doc, start: int, end: int, want_blocks: bool = True) -> Tuple[List[str], List[TextBlock]]:
+    """Extract per-page text and positioned blocks from pages [start, end) of an open document"""
+    if not want_blocks:
+        # Plain text skips building the blocks/lines/spans layout tree
+        return [page.get_text("text") for page in doc.pages(start, end)], []
+    
+    page_texts: List[str] = []
+    blocks: List[TextBlock] = []
+    blocks_append = blocks.append  # hoisted out of the per-block loop
+    
+    for page in doc.pages(start, end):
+        text_parts: List[str] = []
+        page_blocks = []
+        sizes: List[float] = []
+        
+        # Extract text blocks with positioning
+        text_dict = page.get_text("dict")
+        
+        for block in text_dict["blocks"]:
+            if "lines" in block:
+                span_parts = []
+                max_size = 0.0
+                bold = False
+                for line in block["lines"]:
+                    for span in line["spans"]:
+                        span_parts.append(span["text"])
+                        size = span["size"]
+                        sizes.append(size)
+                        if size > max_size:
+                            max_size = size
+                        if span["flags"] & 16:  # MuPDF bold flag
+                            bold = True
+                block_text = "".join(span_parts)
+                
+                if block_text.strip():
+                    page_blocks.append((block_text, block["bbox"], max_size, bold))
+                    text_parts.append(block_text + "\n")
+        
+        # Headings are set larger than the page's body text, or short and bold
+        heading_size = 1.2 * statistics.median(sizes) if sizes else 0.0
+        for block_text, bbox, max_size, bold in page_blocks:
+            is_heading = max_size > heading_size or (bold and len(block_text) < 100)
+            blocks_append(TextBlock(
+                type="heading" if is_heading else "text",
+                text=block_text.strip(),
+                bbox=bbox,
+                page=page.number + 1
+            ))
+        
+        page_texts.append("".join(text_parts))
+    
+    return page_texts, blocks
+
+def _extract_page_range(source: Union[bytes, str], start: int, end: int, want_blocks: bool = True) -> Tuple[List[str], List[TextBlock]]:
+    """Worker entry point: open the PDF (bytes or a file path) in this process and extract a page range"""
+    if isinstance(source, str):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    try:
+        return _extract_pages(doc, start, end, want_blocks)
+    finally:
+        doc.close()
+
 class PDFExtractor:
     """PDF text extraction service with native + OCR fallback"""
     
@@ -51,39 +208,172 @@ class PDFExtractor:
         self.ocr_backend = os.getenv("OCR_BACKEND", "none").lower()
         self.confidence_threshold = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.7"))
         self.max_pages = int(os.getenv("MAX_PDF_PAGES", "150"))
+        self.max_workers = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+        self.ocr_concurrency = int(os.getenv("OCR_CONCURRENCY", "8"))
+        # Textract/Vision rescale internally, so ~150 DPI is enough; Tesseract needs more
+        self.ocr_render_zoom = float(os.getenv("OCR_RENDER_ZOOM", "1.5"))
+        self.tesseract_render_zoom = float(os.getenv("OCR_TESSERACT_ZOOM", "2.0"))
+        # Scratch bucket for whole-document Textract jobs (unset = per-page calls)
+        self.textract_s3_bucket = os.getenv("TEXTRACT_S3_BUCKET", "")
+        self.textract_job_timeout = int(os.getenv("TEXTRACT_JOB_TIMEOUT", "300"))
+        # Pages with less embedded text than this are treated as scans
+        self.scanned_page_chars = 50
+        self.want_blocks = os.getenv("PDF_EXTRACT_BLOCKS", "0") == "1"
+        self.cache_enabled = os.getenv("PDF_EXTRACT_CACHE", "0") == "1"
+        self.cache_size = 128
+        self.cache_dir = Path(tempfile.gettempdir()) / "pdf_extract_cache"
+        self._cache: "OrderedDict[str, ExtractResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_dir_ok: Optional[bool] = None  # checked on first disk access
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._http = None
+        self._textract_client = None
+        self._textract_s3_client = None
+        self._vision_client = None
         self._check_ocr_capabilities()
     
+    def _get_http_session(self) -> requests.Session:
+        """Lazily create a keep-alive session so HEAD and GET share one connection"""
+        if self._http is None:
+            self._http = requests.Session()
+            self._http.max_redirects = int(os.getenv("PDF_MAX_REDIRECTS", "5"))
+        return self._http
+    
+    def _get_textract_client(self):
+        """Create the Textract client once; its connection pool matches OCR concurrency"""
+        if self._textract_client is None:
+            import boto3
+            from botocore.config import Config
+            
+            self._textract_client = boto3.client('textract', config=Config(
+                max_pool_connections=max(10, self.ocr_concurrency),
+                retries={'max_attempts': 3, 'mode': 'adaptive'}
+            ))
+        return self._textract_client
+    
+    def _get_textract_s3_client(self):
+        """Create the S3 client for Textract scratch uploads once and reuse it across jobs"""
+        if self._textract_s3_client is None:
+            import boto3
+            
+            self._textract_s3_client = boto3.client('s3')
+        return self._textract_s3_client
+    
+    def _get_vision_client(self):
+        """Create the Vision client once (it holds its own gRPC channel)"""
+        if self._vision_client is None:
+            from google.cloud import vision
+            
+            self._vision_client = vision.ImageAnnotatorClient()
+        return self._vision_client
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the page extraction pool (reused to amortize fork cost)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    atexit.register(self._pool.shutdown, cancel_futures=True)
+        return self._pool
+    
+    def _disk_cache_ready(self) -> bool:
+        """Check once that the disk cache directory is private to this user"""
+        if self._cache_dir_ok is None:
+            self._cache_dir_ok = ensure_private_dir(self.cache_dir)
+        return self._cache_dir_ok
+    
+    def _cache_get(self, key: str) -> Optional[ExtractResult]:
+        """Look up a cached result by content hash (memory first, then disk)"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+        if result is not None:
+            return copy.deepcopy(result)
+        
+        if not self._disk_cache_ready():
+            return None
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                result = _result_from_json(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable extraction cache entry {cache_file}: {e}")
+            return None
+        
+        self._remember(key, result)
+        return copy.deepcopy(result)
+    
+    def _cache_put(self, key: Optional[str], result: ExtractResult):
+        """Store a result in the memory LRU and on disk"""
+        if key is None:
+            return
+        
+        self._remember(key, copy.deepcopy(result))
+        if not self._disk_cache_ready():
+            return
+        tmp_name = None
+        try:
+            # Unique temp name per writer, so concurrent threads/processes never share one
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.cache_dir,
+                                             suffix=".tmp", delete=False) as f:
+                tmp_name = f.name
+                f.write(_result_to_json(result))
+            os.replace(tmp_name, self.cache_dir / f"{key}.json")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write extraction cache entry: {e}")
+            if tmp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+    
+    def _remember(self, key: str, result: ExtractResult):
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
     def _check_ocr_capabilities(self):
-        """Check available OCR backends"""
+        """Check available OCR backends (probed with find_spec; the real import happens on first OCR call)"""
         if self.ocr_backend == "textract":
-            try:
-                import boto3
+            if _module_available("boto3"):
                 logger.info("✅ AWS Textract OCR backend available")
-            except ImportError:
+            else:
                 logger.warning("⚠️ AWS Textract not available, falling back to native extraction")
                 self.ocr_backend = "none"
         
         elif self.ocr_backend == "vision":
-            try:
-                from google.cloud import vision
+            if _module_available("google.cloud.vision"):
                 logger.info("✅ Google Cloud Vision OCR backend available")
-            except ImportError:
+            else:
                 logger.warning("⚠️ Google Cloud Vision not available, falling back to native extraction")
                 self.ocr_backend = "none"
         
         elif self.ocr_backend == "self_hosted":
-            try:
-                import pytesseract
+            if _module_available("pytesseract"):
                 logger.info("✅ Self-hosted Tesseract OCR backend available")
-            except ImportError:
+            else:
                 logger.warning("⚠️ Self-hosted Tesseract not available, falling back to native extraction")
                 self.ocr_backend = "none"
         
         else:
             logger.info("✅ Native PDF text extraction only (no OCR)")
     
-    def extract_from_bytes(self, pdf_bytes: bytes, filename: str = "unknown.pdf") -> ExtractResult:
-        """Extract text from PDF bytes with native extraction + OCR fallback"""
+    def extract_from_bytes(self, pdf_bytes: bytes, filename: str = "unknown.pdf",
+                           want_blocks: Optional[bool] = None) -> ExtractResult:
+        """Extract text from PDF bytes with native extraction + OCR fallback.
+        
+        want_blocks controls whether positioned TextBlocks are built for native
+        extraction; it defaults to PDF_EXTRACT_BLOCKS since most callers only
+        read ExtractResult.text.
+        """
+        if want_blocks is None:
+            want_blocks = self.want_blocks
+        
         import time
         start_time = time.time()
         
@@ -91,10 +381,20 @@ class PDFExtractor:
             # Validate PDF
             self._validate_pdf_bytes(pdf_bytes)
             
+            # Identical content (re-uploads, re-fetched URLs) is served from cache
+            cache_key = None
+            if self.cache_enabled:
+                cache_key = f"{hashlib.sha256(pdf_bytes).hexdigest()}-{'blocks' if want_blocks else 'text'}"
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    logger.info(f"✅ Extraction cache hit for {filename}: {cached.pages} pages, {len(cached.text)} chars")
+                    return cached
+            
             # Try native extraction first
             try:
-                result = self._extract_native(pdf_bytes)
+                result = self._extract_native(pdf_bytes, want_blocks)
                 logger.info(f"✅ Native extraction successful for {filename}: {result.pages} pages, {len(result.text)} chars")
+                self._cache_put(cache_key, result)
                 return result
                 
             except Exception as e:
@@ -105,6 +405,7 @@ class PDFExtractor:
                     try:
                         result = self._extract_with_ocr(pdf_bytes, filename)
                         logger.info(f"✅ OCR extraction successful for {filename}: {result.pages} pages, {len(result.text)} chars")
+                        self._cache_put(cache_key, result)
                         return result
                     except Exception as ocr_error:
                         logger.error(f"❌ OCR extraction also failed for {filename}: {ocr_error}")
@@ -128,110 +429,229 @@ class PDFExtractor:
             
             # Download PDF with limits
             timeout = int(os.getenv("PDF_DOWNLOAD_TIMEOUT", "30"))
-            max_redirects = int(os.getenv("PDF_MAX_REDIRECTS", "5"))
+            max_size = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+            session = self._get_http_session()
             
-            response = requests.get(
+            # HEAD first so oversized or non-PDF URLs are rejected without a download;
+            # servers that refuse HEAD simply fall through to the GET checks
+            try:
+                head = session.head(url, timeout=min(timeout, 5), allow_redirects=True)
+            except requests.RequestException as e:
+                logger.debug(f"HEAD request failed for {url}, continuing with GET: {e}")
+                head = None
+            if head is not None and head.ok:
+                content_type = head.headers.get('content-type', '').lower()
+                if content_type and 'pdf' not in content_type:
+                    raise PDFValidationError(f"URL does not return PDF content: {content_type}")
+                content_length = head.headers.get('content-length', '')
+                if content_length.isdigit() and int(content_length) > max_size:
+                    raise PDFValidationError(f"PDF exceeds size limit: {content_length} bytes")
+            
+            response = session.get(
                 url, 
                 timeout=timeout, 
                 allow_redirects=True,
-                max_redirects=max_redirects,
                 stream=True
             )
-            response.raise_for_status()
             
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            if 'pdf' not in content_type:
-                raise PDFValidationError(f"URL does not return PDF content: {content_type}")
-            
-            # Download with size limit
-            max_size = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
-            pdf_bytes = b""
-            
-            for chunk in response.iter_content(chunk_size=8192):
-                pdf_bytes += chunk
-                if len(pdf_bytes) > max_size:
-                    raise PDFValidationError(f"PDF exceeds size limit: {len(pdf_bytes)} bytes")
+            # Closing the response on any early exit tears down the connection
+            # instead of draining the rest of the body
+            with response:
+                response.raise_for_status()
+                
+                # Check content type
+                content_type = response.headers.get('content-type', '').lower()
+                if 'pdf' not in content_type:
+                    raise PDFValidationError(f"URL does not return PDF content: {content_type}")
+                
+                # Download with size limit
+                buf = bytearray()
+                magic_checked = False
+                
+                # Grow a single bytearray in place; bytes += chunk would copy the whole buffer per chunk
+                for chunk in response.iter_content(chunk_size=65536):
+                    buf.extend(chunk)
+                    # Reject HTML error pages and the like on the first chunk, not after the download
+                    if not magic_checked and len(buf) >= 4:
+                        if buf[:4] != b'%PDF':
+                            raise PDFValidationError("File does not appear to be a valid PDF")
+                        magic_checked = True
+                    if len(buf) > max_size:
+                        raise PDFValidationError(f"PDF exceeds size limit: {len(buf)} bytes")
             
             # Extract text
             filename = urlparse(url).path.split('/')[-1] or "downloaded.pdf"
-            return self.extract_from_bytes(pdf_bytes, filename)
+            return self.extract_from_bytes(bytes(buf), filename)
             
         except requests.RequestException as e:
             raise PDFExtractionError(f"Failed to download PDF from {url}: {str(e)}")
         except Exception as e:
             raise PDFExtractionError(f"Failed to process PDF from {url}: {str(e)}")
     
-    def _extract_native(self, pdf_bytes: bytes) -> ExtractResult:
+    def _extract_native(self, pdf_bytes: bytes, want_blocks: bool = True) -> ExtractResult:
         """Extract text using native PDF libraries"""
         try:
             # Try PyMuPDF first (better text positioning)
             try:
-                return self._extract_with_pymupdf(pdf_bytes)
+                return self._extract_with_pymupdf(pdf_bytes, want_blocks)
             except Exception as e:
-                logger.warning(f"⚠️ PyMuPDF failed, trying pdfminer: {e}")
+                if pdfium is None:
+                    logger.warning(f"⚠️ PyMuPDF failed, trying pdfminer: {e}")
+                    return self._extract_with_pdfminer(pdf_bytes)
+                logger.warning(f"⚠️ PyMuPDF failed, trying pdfium: {e}")
+            
+            # pdfium is far faster than pdfminer's pure-Python layout analysis
+            try:
+                return self._extract_with_pdfium(pdf_bytes)
+            except Exception as e:
+                logger.warning(f"⚠️ pdfium failed, trying pdfminer: {e}")
                 return self._extract_with_pdfminer(pdf_bytes)
                 
         except Exception as e:
             raise PDFExtractionError(f"Native extraction failed: {str(e)}")
     
-    def _extract_with_pymupdf(self, pdf_bytes: bytes) -> ExtractResult:
+    def _extract_with_pymupdf(self, pdf_bytes: bytes, want_blocks: bool = True) -> ExtractResult:
         """Extract text using PyMuPDF (fitz)"""
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        page_count = doc.page_count
         
-        if doc.page_count > self.max_pages:
-            raise PDFValidationError(f"PDF has too many pages: {doc.page_count} > {self.max_pages}")
+        if page_count > self.max_pages:
+            doc.close()
+            raise PDFValidationError(f"PDF has too many pages: {page_count} > {self.max_pages}")
         
-        all_text = ""
-        blocks = []
+        workers = min(self.max_workers, max(1, page_count // 4))
         
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
+        if page_count <= 2 or workers <= 1:
+            # Small documents: pool overhead outweighs the gain
+            try:
+                page_texts, blocks = _extract_pages(doc, 0, page_count, want_blocks)
+            finally:
+                doc.close()
+        else:
+            doc.close()
+            # Large PDFs are spilled to one temp file that every worker opens by
+            # path, instead of pickling a full copy of the bytes to each worker
+            spill_path = None
+            if len(pdf_bytes) > _SPILL_BYTES:
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+                    f.write(pdf_bytes)
+                spill_path = f.name
             
-            # Extract text blocks with positioning
-            text_dict = page.get_text("dict")
-            
-            for block in text_dict["blocks"]:
-                if "lines" in block:
-                    block_text = ""
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            block_text += span["text"]
-                    
-                    if block_text.strip():
-                        # Determine block type
-                        block_type = "text"
-                        if block_text.isupper() and len(block_text) < 100:
-                            block_type = "heading"
-                        
-                        blocks.append(TextBlock(
-                            type=block_type,
-                            text=block_text.strip(),
-                            bbox=block["bbox"],
-                            page=page_num + 1
-                        ))
-                        all_text += block_text + "\n"
-        
-        doc.close()
+            try:
+                # Fan page ranges out to worker processes, then reassemble in page order
+                chunk = math.ceil(page_count / workers)
+                source = spill_path or pdf_bytes
+                futures = [
+                    self._get_pool().submit(_extract_page_range, source, start, min(start + chunk, page_count), want_blocks)
+                    for start in range(0, page_count, chunk)
+                ]
+                page_texts = []
+                blocks = []
+                for future in futures:
+                    texts_part, blocks_part = future.result()
+                    page_texts.extend(texts_part)
+                    blocks.extend(blocks_part)
+            finally:
+                if spill_path:
+                    os.unlink(spill_path)
         
         # Calculate confidence based on text quality
+        confidence = self._calculate_native_confidence("".join(page_texts))
+        ocr_used = False
+        
+        # Mixed documents: OCR only the scanned pages instead of all or nothing
+        scanned_pages = [i for i, page_text in enumerate(page_texts) if len(page_text.strip()) < self.scanned_page_chars]
+        if scanned_pages and self.ocr_backend != "none":
+            try:
+                ocr_results = self._ocr_page_results(pdf_bytes, scanned_pages)
+            except Exception as e:
+                logger.warning(f"⚠️ OCR of scanned pages failed, keeping native text: {e}")
+                ocr_results = []
+            
+            if ocr_results:
+                ocr_pages = set()
+                ocr_text_parts: List[str] = []
+                ocr_blocks = []
+                for page_num, page_text, page_blocks in ocr_results:
+                    ocr_pages.add(page_num)
+                    page_texts[page_num] = page_text
+                    ocr_text_parts.append(page_text)
+                    ocr_blocks.extend(page_blocks)
+                
+                if want_blocks:
+                    blocks = [block for block in blocks if block.page - 1 not in ocr_pages] + ocr_blocks
+                    blocks.sort(key=lambda block: block.page)
+                
+                # Page-weighted average of native and OCR confidence
+                native_confidence = self._calculate_native_confidence(
+                    "".join(page_text for i, page_text in enumerate(page_texts) if i not in ocr_pages)
+                )
+                ocr_confidence = self._calculate_ocr_confidence("".join(ocr_text_parts), ocr_blocks)
+                confidence = (
+                    native_confidence * (page_count - len(ocr_pages)) + ocr_confidence * len(ocr_pages)
+                ) / page_count
+                ocr_used = True
+        
+        all_text = "".join(page_texts)
+        
+        return ExtractResult(
+            pages=page_count,
+            text=all_text.strip(),
+            blocks=blocks,
+            confidence=confidence,
+            engine="native-pymupdf+ocr" if ocr_used else "native-pymupdf",
+            extraction_time_ms=0,  # Will be set by caller
+            ocr_used=ocr_used
+        )
+    
+    def _extract_with_pdfium(self, pdf_bytes: bytes) -> ExtractResult:
+        """Extract text using pypdfium2 (secondary engine)"""
+        doc = pdfium.PdfDocument(BytesIO(pdf_bytes))
+        try:
+            page_count = len(doc)
+            if page_count > self.max_pages:
+                raise PDFValidationError(f"PDF has too many pages: {page_count} > {self.max_pages}")
+            
+            text_parts: List[str] = []
+            blocks: List[TextBlock] = []
+            for page_num, page in enumerate(doc, start=1):
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                text_parts.append(page_text)
+                if page_text.strip():
+                    # pdfium text ranges carry no layout, one block per page
+                    blocks.append(TextBlock(
+                        type="text",
+                        text=page_text.strip(),
+                        bbox=(0, 0, 0, 0),
+                        page=page_num
+                    ))
+        finally:
+            doc.close()
+        
+        all_text = "\n".join(text_parts)
         confidence = self._calculate_native_confidence(all_text)
         
         return ExtractResult(
-            pages=doc.page_count,
+            pages=page_count,
             text=all_text.strip(),
             blocks=blocks,
             confidence=confidence,
-            engine="native-pymupdf",
+            engine="native-pdfium",
             extraction_time_ms=0,  # Will be set by caller
             ocr_used=False
         )
     
     def _extract_with_pdfminer(self, pdf_bytes: bytes) -> ExtractResult:
-        """Extract text using pdfminer.six (fallback)"""
-        output = StringIO()
-        extract_text_to_fp(BytesIO(pdf_bytes), output, laparams=LAParams())
-        text = output.getvalue()
+        """Extract text using pdfminer.six (last-resort fallback)"""
+        # Write encoded bytes and decode once; boxes_flow=None skips the
+        # reading-order reconstruction, the slowest layout analysis step
+        output = BytesIO()
+        laparams = LAParams(line_margin=0.5, char_margin=2.0, word_margin=0.1, boxes_flow=None)
+        extract_text_to_fp(BytesIO(pdf_bytes), output, laparams=laparams, codec="utf-8")
+        text = output.getvalue().decode("utf-8")
         output.close()
         
         # Estimate page count (rough approximation)
@@ -262,105 +682,174 @@ class PDFExtractor:
     
     def _extract_with_ocr(self, pdf_bytes: bytes, filename: str) -> ExtractResult:
         """Extract text using OCR backend"""
+        page_results = self._ocr_page_results(pdf_bytes)
+        
+        text_parts: List[str] = []
+        blocks = []
+        for _, page_text, page_blocks in page_results:
+            text_parts.append(page_text)
+            blocks.extend(page_blocks)
+        all_text = "".join(text_parts)
+        
+        confidence = self._calculate_ocr_confidence(all_text, blocks)
+        
+        return ExtractResult(
+            pages=len(page_results),
+            text=all_text.strip(),
+            blocks=blocks,
+            confidence=confidence,
+            engine=OCR_ENGINES[self.ocr_backend],
+            extraction_time_ms=0,  # Will be set by caller
+            ocr_used=True
+        )
+    
+    def _ocr_page_results(self, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """OCR the given pages (default: the first pages) with the configured backend"""
         if self.ocr_backend == "textract":
-            return self._extract_with_textract(pdf_bytes, filename)
+            return self._textract_pages(pdf_bytes, page_indices)
         elif self.ocr_backend == "vision":
-            return self._extract_with_vision(pdf_bytes, filename)
+            return self._vision_pages(pdf_bytes, page_indices)
         elif self.ocr_backend == "self_hosted":
-            return self._extract_with_tesseract(pdf_bytes, filename)
+            return self._tesseract_pages(pdf_bytes, page_indices)
         else:
             raise PDFExtractionError("No OCR backend available")
     
-    def _extract_with_textract(self, pdf_bytes: bytes, filename: str) -> ExtractResult:
-        """Extract text using AWS Textract"""
+    def _ocr_pages(self, images: List[Any], ocr_page, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """Run ocr_page(page_num, image) -> (page_num, page_text, page_blocks) concurrently.
+        
+        OCR calls are network-bound (Textract/Vision) or run in a subprocess
+        (Tesseract), so a thread pool overlaps them without GIL contention.
+        Results are returned in page order.
+        """
+        page_nums = page_indices[:len(images)] if page_indices is not None else range(len(images))
+        workers = max(1, min(len(images), self.ocr_concurrency))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(ocr_page, page_nums, images))
+        
+        return sorted(results, key=lambda r: r[0])
+    
+    def _textract_pages(self, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """Extract page text using AWS Textract"""
         try:
-            import boto3
+            textract = self._get_textract_client()
             
-            textract = boto3.client('textract')
+            # One async job for the whole PDF instead of a round trip per page
+            if self.textract_s3_bucket:
+                try:
+                    return self._textract_async_pages(textract, pdf_bytes, page_indices)
+                except Exception as e:
+                    logger.warning(f"⚠️ Textract async job failed, falling back to per-page calls: {e}")
             
-            # Convert PDF to images for Textract
-            images = self._pdf_to_images(pdf_bytes)
+            # Render PDF pages straight to PNG bytes for Textract
+            images = self._pdf_to_png_pages(pdf_bytes, page_indices)
             
-            all_text = ""
-            blocks = []
-            page_count = len(images)
-            
-            for page_num, image in enumerate(images):
-                # Convert PIL image to bytes
-                img_bytes = io.BytesIO()
-                image.save(img_bytes, format='PNG')
-                img_bytes.seek(0)
-                
+            def ocr_page(page_num, png_bytes):
                 # Call Textract
                 response = textract.detect_document_text(
-                    Document={'Bytes': img_bytes.read()}
+                    Document={'Bytes': png_bytes}
                 )
-                
-                page_text = ""
-                for item in response['Blocks']:
-                    if item['BlockType'] == 'LINE':
-                        text = item['Text']
-                        page_text += text + "\n"
-                        
-                        # Create block with positioning
-                        if 'Geometry' in item:
-                            bbox = item['Geometry']['BoundingBox']
-                            blocks.append(TextBlock(
-                                type="text",
-                                text=text,
-                                bbox=(bbox['Left'], bbox['Top'], bbox['Left'] + bbox['Width'], bbox['Top'] + bbox['Height']),
-                                page=page_num + 1,
-                                confidence=item.get('Confidence', 0) / 100.0
-                            ))
-                
-                all_text += page_text
-            
-            confidence = self._calculate_ocr_confidence(all_text, blocks)
-            
-            return ExtractResult(
-                pages=page_count,
-                text=all_text.strip(),
-                blocks=blocks,
-                confidence=confidence,
-                engine="ocr-textract",
-                extraction_time_ms=0,  # Will be set by caller
-                ocr_used=True
-            )
+                return self._textract_page_result(page_num, response['Blocks'])
+            
+            return self._ocr_pages(images, ocr_page, page_indices)
             
         except ImportError:
             raise PDFExtractionError("AWS Textract not available")
         except Exception as e:
             raise PDFExtractionError(f"Textract extraction failed: {str(e)}")
     
-    def _extract_with_vision(self, pdf_bytes: bytes, filename: str) -> ExtractResult:
-        """Extract text using Google Cloud Vision"""
+    def _textract_async_pages(self, textract, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """Run StartDocumentTextDetection on the whole PDF via S3 and collect LINE blocks per page"""
+        import time
+        
+        s3 = self._get_textract_s3_client()
+        # Unique per job: concurrent jobs on the same PDF must not delete each other's scratch object
+        key = f"textract/{hashlib.sha256(pdf_bytes).hexdigest()}-{uuid.uuid4().hex}.pdf"
+        s3.put_object(Bucket=self.textract_s3_bucket, Key=key, Body=pdf_bytes)
+        
         try:
-            from google.cloud import vision
-            
-            client = vision.ImageAnnotatorClient()
+            job = textract.start_document_text_detection(
+                DocumentLocation={'S3Object': {'Bucket': self.textract_s3_bucket, 'Name': key}}
+            )
+            job_id = job['JobId']
             
-            # Convert PDF to images
-            images = self._pdf_to_images(pdf_bytes)
+            # Poll with exponential backoff until the job leaves IN_PROGRESS
+            delay = 0.5
+            deadline = time.monotonic() + self.textract_job_timeout
+            while True:
+                response = textract.get_document_text_detection(JobId=job_id)
+                status = response['JobStatus']
+                if status != 'IN_PROGRESS':
+                    break
+                if time.monotonic() > deadline:
+                    raise PDFExtractionError(f"Textract job {job_id} timed out")
+                time.sleep(delay)
+                delay = min(delay * 2, 8.0)
             
-            all_text = ""
-            blocks = []
-            page_count = len(images)
+            if status not in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+                raise PDFExtractionError(f"Textract job {job_id} finished with status {status}")
             
-            for page_num, image in enumerate(images):
-                # Convert PIL image to bytes
-                img_bytes = io.BytesIO()
-                image.save(img_bytes, format='PNG')
-                img_bytes.seek(0)
+            # Results are paginated; group LINE blocks by their 1-based Page
+            items_by_page: Dict[int, List[Dict[str, Any]]] = {}
+            while True:
+                for item in response['Blocks']:
+                    if item['BlockType'] == 'LINE':
+                        items_by_page.setdefault(item.get('Page', 1) - 1, []).append(item)
+                next_token = response.get('NextToken')
+                if not next_token:
+                    break
+                response = textract.get_document_text_detection(JobId=job_id, NextToken=next_token)
+        finally:
+            s3.delete_object(Bucket=self.textract_s3_bucket, Key=key)
+        
+        wanted = set(page_indices) if page_indices is not None else None
+        return [
+            self._textract_page_result(page_num, items_by_page[page_num])
+            for page_num in sorted(items_by_page)
+            if wanted is None or page_num in wanted
+        ]
+    
+    def _textract_page_result(self, page_num: int, items: List[Dict[str, Any]]) -> Tuple[int, str, List[TextBlock]]:
+        """Turn one page's Textract blocks into (page_num, page_text, page_blocks)"""
+        line_parts = []
+        page_blocks = []
+        for item in items:
+            if item['BlockType'] == 'LINE':
+                text = item['Text']
+                line_parts.append(text + "\n")
                 
+                # Create block with positioning
+                if 'Geometry' in item:
+                    bbox = item['Geometry']['BoundingBox']
+                    page_blocks.append(TextBlock(
+                        type="text",
+                        text=text,
+                        bbox=(bbox['Left'], bbox['Top'], bbox['Left'] + bbox['Width'], bbox['Top'] + bbox['Height']),
+                        page=page_num + 1,
+                        confidence=item.get('Confidence', 0) / 100.0
+                    ))
+        
+        return page_num, "".join(line_parts), page_blocks
+    
+    def _vision_pages(self, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """Extract page text using Google Cloud Vision"""
+        try:
+            from google.cloud import vision
+            
+            client = self._get_vision_client()
+            
+            # Render PDF pages straight to PNG bytes
+            images = self._pdf_to_png_pages(pdf_bytes, page_indices)
+            
+            def ocr_page(page_num, png_bytes):
                 # Create Vision API request
-                image_vision = vision.Image(content=img_bytes.read())
+                image_vision = vision.Image(content=png_bytes)
                 response = client.document_text_detection(image=image_vision)
                 
                 if response.error.message:
                     raise PDFExtractionError(f"Vision API error: {response.error.message}")
                 
-                page_text = response.full_text_annotation.text
-                all_text += page_text + "\n"
+                page_text = response.full_text_annotation.text + "\n"
+                page_blocks = []
                 
                 # Create blocks from detected text
                 for page in response.full_text_annotation.pages:
@@ -376,91 +865,83 @@ class PDFExtractor:
                                         vertices[2].x, vertices[2].y
                                     )
                                     
-                                    blocks.append(TextBlock(
+                                    page_blocks.append(TextBlock(
                                         type="text",
                                         text=word_text,
                                         bbox=bbox,
                                         page=page_num + 1,
                                         confidence=0.9  # Vision API doesn't provide confidence
                                     ))
+                
+                return page_num, page_text, page_blocks
             
-            confidence = self._calculate_ocr_confidence(all_text, blocks)
-            
-            return ExtractResult(
-                pages=page_count,
-                text=all_text.strip(),
-                blocks=blocks,
-                confidence=confidence,
-                engine="ocr-vision",
-                extraction_time_ms=0,  # Will be set by caller
-                ocr_used=True
-            )
+            return self._ocr_pages(images, ocr_page, page_indices)
             
         except ImportError:
             raise PDFExtractionError("Google Cloud Vision not available")
         except Exception as e:
             raise PDFExtractionError(f"Vision API extraction failed: {str(e)}")
     
-    def _extract_with_tesseract(self, pdf_bytes: bytes, filename: str) -> ExtractResult:
-        """Extract text using self-hosted Tesseract"""
+    def _tesseract_pages(self, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[Tuple[int, str, List[TextBlock]]]:
+        """Extract page text using self-hosted Tesseract"""
         try:
             import pytesseract
             
-            # Convert PDF to images
-            images = self._pdf_to_images(pdf_bytes)
-            
-            all_text = ""
-            blocks = []
-            page_count = len(images)
+            # Render grayscale pixmaps; tesseract binarizes grayscale input anyway
+            pixmaps = self._render_pixmaps(pdf_bytes, self.tesseract_render_zoom, fitz.csGRAY, page_indices)
             
-            for page_num, image in enumerate(images):
-                # Extract text with Tesseract
-                page_text = pytesseract.image_to_string(image)
-                all_text += page_text + "\n"
+            def ocr_page(page_num, pix):
+                # Hand tesseract a PGM file: a tiny header plus the raw samples,
+                # so neither side pays for a PNG encode/decode
+                path = self._write_pgm(pix)
+                try:
+                    page_text = pytesseract.image_to_string(path)
+                finally:
+                    os.unlink(path)
                 
                 # Create simple block (Tesseract doesn't provide positioning)
-                blocks.append(TextBlock(
+                page_block = TextBlock(
                     type="text",
                     text=page_text,
                     bbox=(0, 0, 0, 0),
                     page=page_num + 1,
                     confidence=0.8  # Default confidence for Tesseract
-                ))
-            
-            confidence = self._calculate_ocr_confidence(all_text, blocks)
-            
-            return ExtractResult(
-                pages=page_count,
-                text=all_text.strip(),
-                blocks=blocks,
-                confidence=confidence,
-                engine="ocr-tesseract",
-                extraction_time_ms=0,  # Will be set by caller
-                ocr_used=True
-            )
+                )
+                return page_num, page_text + "\n", [page_block]
+            
+            return self._ocr_pages(pixmaps, ocr_page, page_indices)
             
         except ImportError:
             raise PDFExtractionError("Tesseract not available")
         except Exception as e:
             raise PDFExtractionError(f"Tesseract extraction failed: {str(e)}")
     
-    def _pdf_to_images(self, pdf_bytes: bytes) -> List[Image.Image]:
-        """Convert PDF pages to PIL Images"""
+    def _render_pixmaps(self, pdf_bytes: bytes, zoom: float, colorspace=fitz.csRGB,
+                        page_indices: Optional[List[int]] = None) -> List[fitz.Pixmap]:
+        """Render PDF pages (default: all) to pixmaps for OCR (pixel count grows with zoom squared)"""
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        images = []
+        pixmaps = []
+        mat = fitz.Matrix(zoom, zoom)
+        if page_indices is None:
+            page_indices = range(doc.page_count)
         
-        for page_num in range(min(doc.page_count, 10)):  # Limit to first 10 pages for OCR
+        for page_num in page_indices[:10]:  # Limit to 10 pages for OCR
             page = doc.load_page(page_num)
-            mat = fitz.Matrix(2, 2)  # 2x zoom for better OCR
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PIL Image
-            img_data = pix.tobytes("png")
-            img = Image.open(io.BytesIO(img_data))
-            images.append(img)
+            pixmaps.append(page.get_pixmap(matrix=mat, colorspace=colorspace))
         
         doc.close()
-        return images
+        return pixmaps
+    
+    def _pdf_to_png_pages(self, pdf_bytes: bytes, page_indices: Optional[List[int]] = None) -> List[bytes]:
+        """Convert PDF pages to PNG bytes ready for upload to an OCR API"""
+        return [pix.tobytes("png") for pix in self._render_pixmaps(pdf_bytes, self.ocr_render_zoom, page_indices=page_indices)]
+    
+    def _write_pgm(self, pix: fitz.Pixmap) -> str:
+        """Write a grayscale pixmap to a temporary binary PGM (P5) file and return its path"""
+        with tempfile.NamedTemporaryFile(suffix=".pgm", delete=False) as f:
+            f.write(f"P5\n{pix.width} {pix.height}\n255\n".encode("ascii"))
+            f.write(pix.samples_mv)
+        return f.name
     
     def _calculate_native_confidence(self, text: str) -> float:
         """Calculate confidence score for native extraction"""
@@ -468,17 +949,11 @@ class PDFExtractor:
             return 0.1
         
         # Check for key funding opportunity terms
-        key_terms = [
-            "eligibility", "deadline", "budget", "apply", "funding", "grant",
-            "opportunity", "application", "requirements", "criteria"
-        ]
-        
-        text_lower = text.lower()
-        found_terms = sum(1 for term in key_terms if term in text_lower)
+        found_terms = _count_key_terms(text)
         
         # Base confidence on text length and key terms
         length_score = min(1.0, len(text) / 5000)  # Normalize to 5000 chars
-        term_score = found_terms / len(key_terms)
+        term_score = found_terms / len(KEY_TERMS)
         
         confidence = (length_score * 0.6) + (term_score * 0.4)
         return min(1.0, max(0.1, confidence))
@@ -494,14 +969,8 @@ class PDFExtractor:
         # Adjust based on text length and key terms
         length_score = min(1.0, len(text) / 3000)  # OCR needs more text for confidence
         
-        key_terms = [
-            "eligibility", "deadline", "budget", "apply", "funding", "grant",
-            "opportunity", "application", "requirements", "criteria"
-        ]
-        
-        text_lower = text.lower()
-        found_terms = sum(1 for term in key_terms if term in text_lower)
-        term_score = found_terms / len(key_terms)
+        found_terms = _count_key_terms(text)
+        term_score = found_terms / len(KEY_TERMS)
         
         confidence = (base_confidence * 0.5) + (length_score * 0.3) + (term_score * 0.2)
         return min(1.0, max(0.1, confidence))
@@ -531,6 +1000,12 @@ class PDFExtractor:
         max_size = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
         if len(pdf_bytes) > max_size:
             raise PDFValidationError(f"PDF exceeds size limit: {len(pdf_bytes)} bytes")
+        
+        # Cheap page-count peek so oversized documents are rejected before MuPDF
+        # parses them; fitz still does the authoritative check during extraction
+        page_count = _peek_page_count(pdf_bytes)
+        if page_count is not None and page_count > self.max_pages:
+            raise PDFValidationError(f"PDF has too many pages: {page_count} > {self.max_pages}")
     
     def _validate_url(self, url: str):
         """Validate URL for PDF download"""
@@ -548,6 +1023,8 @@ class PDFExtractor:
         if not parsed.netloc:
             raise PDFValidationError("Invalid URL format")
 
-# Global extractor instance
-pdf_extractor = PDFExtractor()
+@functools.cache
+def get_pdf_extractor() -> PDFExtractor:
+    """Shared extractor instance, built on first use rather than at import time"""
+    return PDFExtractor()
 
@@ -1,11 +1,20 @@
 import os
+import atexit
+import asyncio
+import contextlib
+import functools
 import logging
 import re
 import json
-from typing import Dict, Any, List, Optional
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
-from services.pdf_extract import ExtractResult
+from dataclasses import dataclass, replace
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from services.pdf_extract import ExtractResult, ensure_private_dir
 
 # Import existing parser for consistency
 from utils.openai_parser import (
@@ -16,7 +25,174 @@ from utils.openai_parser import (
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_MAX_COMPLETION_TOKENS = 4096
+# Bump when the extraction prompt or system message changes so cached results are not reused
+PROMPT_VERSION = "1"
+
+try:
+    import re2  # google-re2: linear-time matching, no catastrophic backtracking
+except ImportError:
+    re2 = None
+
+try:
+    import orjson  # faster JSON for model replies and the extraction cache
+except ImportError:
+    orjson = None
+
+def _json_loads(data):
+    """Decode JSON from str or bytes; decode errors are json.JSONDecodeError either way"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _json_dumps(obj) -> bytes:
+    """Encode obj as UTF-8 JSON bytes"""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode("utf-8")
+
+try:
+    import ahocorasick  # pyahocorasick: one pass finds every cue phrase
+except ImportError:
+    ahocorasick = None
+
+def _compile(pattern: str, flags: int = re.IGNORECASE):
+    """Compile with RE2 when installed, otherwise (or if RE2 rejects the pattern) with re"""
+    if re2 is not None:
+        try:
+            # Inline flags work with every RE2 binding; only IGNORECASE is used here
+            return re2.compile(("(?i)" if flags & re.IGNORECASE else "") + pattern)
+        except Exception as e:
+            logger.warning(f"⚠️ RE2 could not compile {pattern!r}, using re: {e}")
+    return re.compile(pattern, flags)
+
+# Rule-based extraction patterns, compiled once at import rather than on every PDF
+# Cue-led patterns are paired with their _CUE_PHRASES key; None means no literal cue
+_DONOR_RULES = [(key, _compile(p)) for key, p in (
+    ("donor_source", r'(?:funded by|sponsored by|provided by|grant from)\s*[:.]?\s*([^.\n]+)'),
+    ("donor_org", r'(?:organization|agency|foundation|institution)\s*[:.]?\s*([^.\n]+)'),
+    ("donor_suffix", r'([A-Z][A-Z\s&]+(?:Foundation|Institute|Agency|Department|Ministry|Council))')
+)]
+
+_AMOUNT_PATTERNS = [_compile(p) for p in (
+    r'(\$[\d,]+(?:\.\d{2})?(?:\s*-\s*\$[\d,]+(?:\.\d{2})?)?)',
+    r'(£[\d,]+(?:\.\d{2})?(?:\s*-\s*£[\d,]+(?:\.\d{2})?)?)',
+    r'(€[\d,]+(?:\.\d{2})?(?:\s*-\s*€[\d,]+(?:\.\d{2})?)?)',
+    r'([\d,]+(?:\.\d{2})?\s*(?:USD|GBP|EUR|dollars?|pounds?|euros?))',
+    r'(up to\s+[\d,]+(?:\.\d{2})?\s*(?:USD|GBP|EUR|dollars?|pounds?|euros?))'
+)]
+
+_DEADLINE_RULES = [(key, _compile(p)) for key, p in (
+    ("deadline", r'(?:deadline|closing date|due date|apply by|submission deadline)\s*[:.]?\s*([^.\n]+)'),
+    (None, r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})'),
+    (None, r'(\d{1,2}/\d{1,2}/\d{4})'),
+    (None, r'(\d{4}-\d{2}-\d{2})')
+)]
+
+_LOCATION_RULES = [(key, _compile(p)) for key, p in (
+    ("location_label", r'(?:eligible areas?|geographic scope|location|region)\s*[:.]?\s*([^.\n]+)'),
+    ("location_scope", r'(?:open to|available in|restricted to)\s*([^.\n]+)'),
+    ("location_name", r'(United States|UK|United Kingdom|Canada|Australia|Global|Worldwide|International)')
+)]
+
+_THEME_RULES = [(key, _compile(p)) for key, p in (
+    ("themes_label", r'(?:focus areas?|themes?|priorities?|sectors?|topics?)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)'),
+    ("themes_support", r'(?:supporting|funding|grants? for)\s+([^.\n]+)')
+)]
+
+def _cased_pair(pattern: str) -> Tuple[Any, Any]:
+    """Compile a pattern whose literals are lower case both case-insensitively and for pre-lowered text"""
+    return _compile(pattern), _compile(pattern, 0)
+
+_ELIGIBILITY_RES = _cased_pair(
+    r'(?:eligibility|who can apply|requirements|criteria|qualifications?)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)'
+)
+_BULLET_SPLIT_RE = _compile(r'[•\-\*]|\d+\.', 0)
+# Themes are whole words, so tokenize once and look each word up in a set
+_THEME_VOCAB = frozenset({
+    'education', 'health', 'environment', 'technology', 'arts', 'culture',
+    'social', 'economic', 'youth', 'community', 'research', 'innovation'
+})
+_WORD_RE = _compile(r'\w+', 0)
+_DURATION_RES = _cased_pair(r'(?:duration|project length|funding period|timeline)\s*[:.]?\s*([^.\n]+)')
+_APPLY_RES = _cased_pair(
+    r'(?:how to apply|application process|submission|apply)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)'
+)
+_CONTACT_RES = _cased_pair(r'(?:contact|enquiries?|questions?|email|phone)\s*[:.]?\s*([^.\n]+)')
+
+def _search_group(patterns: Tuple[Any, Any], text: str, text_lower: Optional[str]) -> Optional[str]:
+    """group(1) of the first match of a _cased_pair, in the original case.
+    
+    For ASCII text, text_lower is searched with the case-sensitive pattern (re's
+    IGNORECASE scan is several times slower) and the span is read back from text.
+    """
+    if text_lower is not None:
+        match = patterns[1].search(text_lower)
+        return text[match.start(1):match.end(1)] if match else None
+    match = patterns[0].search(text)
+    return match.group(1) if match else None
+
+# Literal cue phrases (casefolded) each cue-led pattern needs in order to match.
+# One scan of the text finds which cues occur, so patterns whose cues are all
+# absent (including the costly donor-suffix pattern) never run at all.
+_CUE_PHRASES = {
+    "donor_source": ("funded by", "sponsored by", "provided by", "grant from"),
+    "donor_org": ("organization", "agency", "foundation", "institution"),
+    "donor_suffix": ("foundation", "institute", "agency", "department", "ministry", "council"),
+    "deadline": ("deadline", "closing date", "due date", "apply by"),
+    "location_label": ("eligible area", "geographic scope", "location", "region"),
+    "location_scope": ("open to", "available in", "restricted to"),
+    "location_name": ("united states", "uk", "united kingdom", "canada", "australia", "global", "worldwide", "international"),
+    "themes_label": ("focus area", "theme", "priorit", "sector", "topic"),
+    "themes_support": ("supporting", "funding", "grant for", "grants for"),
+    "eligibility": ("eligibility", "who can apply", "requirements", "criteria", "qualification"),
+    "duration": ("duration", "project length", "funding period", "timeline"),
+    "apply": ("application process", "submission", "apply"),
+    "contact": ("contact", "enquirie", "question", "email", "phone"),
+}
+
+def _build_cue_automaton():
+    if ahocorasick is None:
+        return None
+    keys_by_phrase: Dict[str, set] = {}
+    for key, phrases in _CUE_PHRASES.items():
+        for phrase in phrases:
+            keys_by_phrase.setdefault(phrase, set()).add(key)
+    automaton = ahocorasick.Automaton()
+    for phrase, keys in keys_by_phrase.items():
+        automaton.add_word(phrase, frozenset(keys))
+    automaton.make_automaton()
+    return automaton
+
+_CUE_AUTOMATON = _build_cue_automaton()
+
+def _find_cues(text: str, text_lower: Optional[str] = None) -> set:
+    """Return the keys of _CUE_PHRASES whose cue phrases occur in text (text_lower: its ASCII lower case)"""
+    folded = text_lower if text_lower is not None else text.casefold()
+    if not folded.isascii():
+        # re.IGNORECASE also matches "İ" (casefolds to "i" + combining dot) and "ı" to "i"
+        folded = folded.replace("i\u0307", "i").replace("\u0131", "i")
+    if _CUE_AUTOMATON is None:
+        return {key for key, phrases in _CUE_PHRASES.items() if any(phrase in folded for phrase in phrases)}
+    found = set()
+    for _, keys in _CUE_AUTOMATON.iter(folded):
+        found |= keys
+        if len(found) == len(_CUE_PHRASES):
+            break
+    return found
+
+def _cued(rules: List[tuple], cues: set) -> List[Any]:
+    """Patterns from (cue key, pattern) rules whose cue was found; a None key always runs"""
+    return [pattern for key, pattern in rules if key is None or key in cues]
+
+# A title candidate line must mention one of these
+_TITLE_WORDS = ('grant', 'funding', 'opportunity', 'program', 'award')
+
+# validate_parsed_opportunity: fields a usable opportunity needs, and values that mean "not found"
+_REQUIRED_FIELDS = ("title", "donor", "summary", "amount", "deadline", "location", "eligibility", "themes")
+_PLACEHOLDER_VALUES = frozenset({"unknown", "n/a", ""})
+
+# Control characters removed by _sanitize_text (tab, LF and CR are kept as whitespace)
+_CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+
+@dataclass(slots=True, frozen=True)
 class ParsedOpportunity:
     """Parsed funding opportunity data matching gold-standard schema"""
     title: str
@@ -37,6 +213,35 @@ class ParsedOpportunity:
     extraction_engine: str = "unknown"
     pages_extracted: int = 0
 
+@functools.lru_cache(maxsize=1)
+def _prompt_parts() -> Tuple[str, str]:
+    """The shared extraction prompt split around its document body, built once.
+    
+    Only the body varies between PDFs (the template does not embed the URL), so the
+    prefix stays byte-identical across requests, which OpenAI prompt caching needs.
+    """
+    head, tail = create_structured_extraction_prompt("\x00", "PDF_SOURCE").split("\x00")
+    return head, tail
+
+def _extraction_prompt(text: str) -> str:
+    """create_structured_extraction_prompt for text without re-rendering the template"""
+    head, tail = _prompt_parts()
+    return head + text + tail
+
+def _first_valid_match(patterns: List[Any], text: str, is_valid) -> Optional[str]:
+    """Return group(1) of the first match of the highest-priority pattern whose match is valid.
+    
+    Patterns are tried in order and each stops at its first match, so cheap cue
+    patterns that hit early spare the broader ones a full scan of the text.
+    """
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            value = match.group(1).strip()
+            if is_valid(value):
+                return value
+    return None
+
 class PDFParseError(Exception):
     """Exception for PDF parsing failures"""
     pass
@@ -47,6 +252,70 @@ class PDFToGoldParser:
     def __init__(self):
         self.min_confidence_threshold = float(os.getenv("OCR_CONFIDENCE_THRESHOLD", "0.7"))
         self.max_text_length = 12000  # Match existing parser limit
+        # Read once: the per-document path consults this for every PDF
+        self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        # OpenAI results are near-deterministic (temperature 0.05), so re-parsing identical text can be served
+        # from disk; opt-in because the directory is unbounded
+        self.cache_enabled = os.getenv("PDF_GOLD_CACHE", "0") == "1"
+        self.cache_dir = Path(os.getenv("PDF_GOLD_CACHE_DIR") or Path(tempfile.gettempdir()) / "pdf_gold_cache")
+        # parse_many_to_gold_standard: documents per OpenAI request, bounded to stay within the 16k context
+        self.batch_size = int(os.getenv("PDF_GOLD_BATCH_SIZE", "5"))
+        self.batch_max_chars = int(os.getenv("PDF_GOLD_BATCH_MAX_CHARS", "24000"))
+        self.openai_concurrency = int(os.getenv("OPENAI_CONCURRENCY", "16"))
+        # Async OpenAI calls retry rate limits and transient errors after 1s, 2s, 4s, ...
+        self.openai_max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+        self.openai_retry_delay = float(os.getenv("OPENAI_RETRY_DELAY", "1.0"))
+        # Rule-based parsing is pure-Python regex work, so bulk parsing fans out across processes
+        # An empty PDF_PARSE_WORKERS (as in env.example) means the default
+        self.max_workers = int(os.getenv("PDF_PARSE_WORKERS") or os.cpu_count() or 1)
+        if self.max_workers < 1:
+            raise ValueError(f"PDF_PARSE_WORKERS must be at least 1, got {self.max_workers}")
+        self._cache_dir_ok: Optional[bool] = None  # checked on first disk access
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+    
+    def _cache_key(self, text: str) -> str:
+        """Content address of an OpenAI extraction: model, prompt version and sanitized text"""
+        return hashlib.sha256(b"\x00".join([OPENAI_MODEL.encode(), PROMPT_VERSION.encode(), text.encode()])).hexdigest()
+    
+    def _disk_cache_ready(self) -> bool:
+        """Check once that the cache directory is private to this user"""
+        if self._cache_dir_ok is None:
+            self._cache_dir_ok = ensure_private_dir(self.cache_dir)
+        return self._cache_dir_ok
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached raw model output for key, if any"""
+        if not self._disk_cache_ready():
+            return None
+        cache_file = self.cache_dir / f"{key}.json"
+        try:
+            with open(cache_file, "rb") as f:
+                return _json_loads(f.read())["parsed_data"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable OpenAI cache entry {cache_file}: {e}")
+            return None
+    
+    def _cache_put(self, key: str, parsed_data: Dict[str, Any]):
+        """Store raw model output on disk (written to a temp file, then renamed into place)"""
+        if not self._disk_cache_ready():
+            return
+        tmp_name = None
+        try:
+            # Unique temp name per writer, so concurrent threads/tasks never share one
+            with tempfile.NamedTemporaryFile("wb", dir=self.cache_dir, suffix=".tmp", delete=False) as f:
+                tmp_name = f.name
+                f.write(_json_dumps({"parsed_data": parsed_data, "cached_at": datetime.now().isoformat()}))
+            os.replace(tmp_name, self.cache_dir / f"{key}.json")
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Could not write OpenAI cache entry: {e}")
+            if tmp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
     
     def parse_to_gold_standard(self, extract_result: ExtractResult, source_url: str = None) -> ParsedOpportunity:
         """Parse extracted PDF text into gold-standard schema"""
@@ -57,7 +326,7 @@ class PDFToGoldParser:
             clean_text = self._sanitize_text(extract_result.text)
             
             # Use existing OpenAI parser if available
-            if os.getenv("OPENAI_API_KEY"):
+            if self.openai_api_key:
                 try:
                     return self._parse_with_openai(clean_text, extract_result, source_url)
                 except Exception as e:
@@ -70,221 +339,370 @@ class PDFToGoldParser:
             logger.error(f"❌ PDF parsing failed: {e}")
             raise PDFParseError(f"Failed to parse PDF to gold-standard: {str(e)}")
     
-    def _parse_with_openai(self, text: str, extract_result: ExtractResult, source_url: str) -> ParsedOpportunity:
-        """Use existing OpenAI parser for consistent results"""
+    async def parse_to_gold_standard_async(self, extract_result: ExtractResult, source_url: str = None) -> ParsedOpportunity:
+        """Async parse_to_gold_standard: the OpenAI call is awaited instead of blocking the caller"""
         try:
-            # Create prompt using existing parser logic
-            prompt = create_structured_extraction_prompt(text, source_url or "PDF_SOURCE")
-            
-            # Call OpenAI API (reusing existing logic)
-            import openai
-            openai.api_key = os.getenv("OPENAI_API_KEY")
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert data parser. Extract precise information and return only valid JSON with the specified fields."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1800,
-                temperature=0.05,
-            )
+            logger.info(f"🔄 Parsing PDF text to gold-standard schema (engine: {extract_result.engine})")
             
-            content = response.choices[0].message.content.strip()
+            clean_text = self._sanitize_text(extract_result.text)
             
-            # Clean response
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
+            if self.openai_api_key:
+                try:
+                    return await self._parse_with_openai_async(clean_text, extract_result, source_url)
+                except Exception as e:
+                    logger.warning(f"⚠️ OpenAI parsing failed, falling back to rule-based: {e}")
             
-            # Parse JSON
-            parsed_data = json.loads(content.strip())
+            return self._parse_with_rules(clean_text, extract_result, source_url)
             
-            # Validate using existing logic
-            validated_data = validate_extracted_fields(parsed_data, source_url or "PDF_SOURCE")
+        except Exception as e:
+            logger.error(f"❌ PDF parsing failed: {e}")
+            raise PDFParseError(f"Failed to parse PDF to gold-standard: {str(e)}")
+    
+    async def parse_many_async(self, extract_results: List[ExtractResult],
+                               source_urls: Optional[List[str]] = None) -> List[ParsedOpportunity]:
+        """Parse several PDFs concurrently (at most OPENAI_CONCURRENCY OpenAI calls in flight)"""
+        source_urls = source_urls or [None] * len(extract_results)
+        if len(source_urls) != len(extract_results):
+            raise ValueError("source_urls must match extract_results in length")
+        return list(await asyncio.gather(*(
+            self.parse_to_gold_standard_async(extract_result, source_url)
+            for extract_result, source_url in zip(extract_results, source_urls)
+        )))
+    
+    def _parse_with_openai(self, text: str, extract_result: ExtractResult, source_url: str) -> ParsedOpportunity:
+        """Use existing OpenAI parser for consistent results"""
+        try:
+            cache_key, opportunity = self._cached_opportunity(text, extract_result, source_url)
+            if opportunity is not None:
+                return opportunity
             
-            # Convert to ParsedOpportunity
-            return self._convert_to_parsed_opportunity(validated_data, extract_result, source_url)
+            # Create prompt using existing parser logic
+            prompt = _extraction_prompt(text)
+            parsed_data = self._complete_json(prompt, max_tokens=1800)
+            return self._opportunity_from_openai(parsed_data, extract_result, source_url, cache_key)
             
         except Exception as e:
             logger.error(f"❌ OpenAI parsing failed: {e}")
             raise PDFParseError(f"OpenAI parsing failed: {str(e)}")
     
+    async def _parse_with_openai_async(self, text: str, extract_result: ExtractResult, source_url: str) -> ParsedOpportunity:
+        """Async variant of _parse_with_openai; concurrent calls share the OPENAI_CONCURRENCY limit"""
+        try:
+            cache_key, opportunity = self._cached_opportunity(text, extract_result, source_url)
+            if opportunity is not None:
+                return opportunity
+            
+            prompt = _extraction_prompt(text)
+            parsed_data = await self._complete_json_async(prompt, max_tokens=1800)
+            return self._opportunity_from_openai(parsed_data, extract_result, source_url, cache_key)
+            
+        except Exception as e:
+            logger.error(f"❌ OpenAI parsing failed: {e}")
+            raise PDFParseError(f"OpenAI parsing failed: {str(e)}")
+    
+    def _cached_opportunity(self, text: str, extract_result: ExtractResult,
+                            source_url: str) -> Tuple[Optional[str], Optional[ParsedOpportunity]]:
+        """Return (cache key, cached opportunity or None) for sanitized text"""
+        # Identical text was already paid for; revalidate since validation rules may have changed
+        cache_key = self._cache_key(text) if self.cache_enabled else None
+        if cache_key is not None:
+            parsed_data = self._cache_get(cache_key)
+            if parsed_data is not None:
+                logger.info("✅ OpenAI extraction cache hit")
+                return cache_key, self._opportunity_from_openai(parsed_data, extract_result, source_url, None)
+        return cache_key, None
+    
+    def _chat_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """System and user messages for an extraction prompt"""
+        return [
+            {
+                "role": "system", 
+                "content": "You are an expert data parser. Extract precise information and return only valid JSON with the specified fields."
+            },
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _decode_json(self, content: str) -> Any:
+        """Strip Markdown code fences from a model reply and parse it as JSON"""
+        # Clean response (JSON mode replies have no fences; batch replies may)
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        
+        # Parse JSON
+        return _json_loads(content.strip())
+    
+    def _completion_options(self, max_tokens: int, json_object: bool) -> Dict[str, Any]:
+        """Keyword arguments shared by sync and async chat completion calls"""
+        options = {"model": OPENAI_MODEL, "max_tokens": max_tokens, "temperature": 0.05}
+        if json_object:
+            # JSON mode: the reply is always one syntactically valid object, never fenced Markdown
+            options["response_format"] = {"type": "json_object"}
+        return options
+    
+    def _complete_json(self, prompt: str, max_tokens: int, json_object: bool = True) -> Any:
+        """Send one extraction prompt to OpenAI and decode the JSON reply"""
+        # Call OpenAI API (reusing existing logic)
+        import openai
+        openai.api_key = self.openai_api_key
+        
+        response = openai.ChatCompletion.create(
+            messages=self._chat_messages(prompt),
+            **self._completion_options(max_tokens, json_object)
+        )
+        
+        return self._decode_json(response.choices[0].message.content.strip())
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for async OpenAI calls (one per event loop; asyncio primitives are loop-bound)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.openai_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _complete_json_async(self, prompt: str, max_tokens: int, json_object: bool = True) -> Any:
+        """Async _complete_json; an invalid JSON reply is retried once with the parse error as feedback"""
+        messages = self._chat_messages(prompt)
+        for attempt in range(2):
+            content = await self._acreate_with_backoff(messages, max_tokens, json_object)
+            try:
+                return self._decode_json(content)
+            except json.JSONDecodeError as e:
+                if attempt:
+                    raise
+                logger.warning(f"⚠️ OpenAI returned invalid JSON, retrying with feedback: {e}")
+                messages = messages + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": f"That reply was not valid JSON ({e}). Return ONLY the corrected JSON."}
+                ]
+    
+    async def _acreate_with_backoff(self, messages: List[Dict[str, str]], max_tokens: int, json_object: bool) -> str:
+        """One async chat completion, retried with exponential backoff on rate limits and transient API errors.
+        The concurrency slot is released while waiting to retry."""
+        import openai
+        openai.api_key = self.openai_api_key
+        transient = (openai.error.RateLimitError, openai.error.APIConnectionError, openai.error.Timeout,
+                     openai.error.ServiceUnavailableError, openai.error.TryAgain)
+        
+        for attempt in range(self.openai_max_retries + 1):
+            try:
+                async with self._get_semaphore():
+                    response = await openai.ChatCompletion.acreate(
+                        messages=messages,
+                        **self._completion_options(max_tokens, json_object)
+                    )
+                return response.choices[0].message.content.strip()
+            except transient as e:
+                if attempt == self.openai_max_retries:
+                    raise
+                delay = self.openai_retry_delay * 2 ** attempt
+                logger.warning(f"⚠️ OpenAI request failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    def _opportunity_from_openai(self, parsed_data: Dict[str, Any], extract_result: ExtractResult,
+                                 source_url: str, cache_key: Optional[str]) -> ParsedOpportunity:
+        """Validate one model-extracted record, convert it and cache the raw output"""
+        # Validate using existing logic (it annotates the dict, so cache the raw output)
+        raw_data = dict(parsed_data)
+        validated_data = validate_extracted_fields(parsed_data, source_url or "PDF_SOURCE")
+        
+        # Convert to ParsedOpportunity
+        opportunity = self._convert_to_parsed_opportunity(validated_data, extract_result, source_url)
+        if cache_key is not None:
+            self._cache_put(cache_key, raw_data)
+        return opportunity
+    
+    def parse_many_to_gold_standard(self, extract_results: List[ExtractResult],
+                                    source_urls: Optional[List[str]] = None) -> List[ParsedOpportunity]:
+        """Parse several PDFs, sending up to batch_size texts in each OpenAI request.
+        
+        One request per batch pays the system prompt and round-trip once instead of
+        per PDF. Any document a batch fails to cover goes through parse_to_gold_standard.
+        Without OpenAI, rule-based parsing is spread over PDF_PARSE_WORKERS processes.
+        """
+        source_urls = source_urls or [None] * len(extract_results)
+        if len(source_urls) != len(extract_results):
+            raise ValueError("source_urls must match extract_results in length")
+        
+        results: List[Optional[ParsedOpportunity]] = [None] * len(extract_results)
+        if self.openai_api_key:
+            pending = []
+            for i, extract_result in enumerate(extract_results):
+                clean_text = self._sanitize_text(extract_result.text)
+                cache_key = self._cache_key(clean_text) if self.cache_enabled else None
+                cached = self._cache_get(cache_key) if cache_key is not None else None
+                if cached is not None:
+                    results[i] = self._opportunity_from_openai(cached, extract_result, source_urls[i], None)
+                else:
+                    pending.append((i, clean_text, cache_key))
+            
+            for batch in self._batches(pending):
+                try:
+                    # JSON mode only allows a top-level object, so the batch array is requested as plain text
+                    items = self._complete_json(self._build_batch_prompt([text for _, text, _ in batch]),
+                                                max_tokens=min(1800 * len(batch), OPENAI_MAX_COMPLETION_TOKENS),
+                                                json_object=False)
+                    if not isinstance(items, list) or len(items) != len(batch):
+                        raise ValueError(f"expected a JSON array of {len(batch)} objects")
+                    for (i, _, cache_key), item in zip(batch, items):
+                        results[i] = self._opportunity_from_openai(item, extract_results[i], source_urls[i], cache_key)
+                except Exception as e:
+                    logger.warning(f"⚠️ Batched OpenAI parsing failed for {len(batch)} PDFs, parsing individually: {e}")
+        
+        remaining = [i for i, result in enumerate(results) if result is None]
+        if not self.openai_api_key and len(remaining) > 1 and self.max_workers > 1:
+            # Without OpenAI every document takes the rule-based path; blocks are not needed for it
+            jobs = [(replace(extract_results[i], blocks=[]), source_urls[i]) for i in remaining]
+            chunksize = max(1, len(jobs) // (self.max_workers * 4))
+            for i, result in zip(remaining, self._get_pool().map(_parse_in_worker, jobs, chunksize=chunksize)):
+                results[i] = result
+        else:
+            for i in remaining:
+                results[i] = self.parse_to_gold_standard(extract_results[i], source_urls[i])
+        return results
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the rule-based parsing pool (reused to amortize worker start-up)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    atexit.register(self._pool.shutdown, cancel_futures=True)
+        return self._pool
+    
+    def _batches(self, pending: List[tuple]):
+        """Group pending (index, text, cache_key) items by document count and total text size"""
+        batch, batch_chars = [], 0
+        for item in pending:
+            if batch and (len(batch) >= self.batch_size or batch_chars + len(item[1]) > self.batch_max_chars):
+                yield batch
+                batch, batch_chars = [], 0
+            batch.append(item)
+            batch_chars += len(item[1])
+        if batch:
+            yield batch
+    
+    def _build_batch_prompt(self, texts: List[str]) -> str:
+        """Wrap several documents in the standard extraction prompt, asking for a JSON array"""
+        documents = "\n\n".join(f"<<DOC {i}>>\n{text}" for i, text in enumerate(texts))
+        prompt = _extraction_prompt(documents)
+        return (
+            f"{prompt}\n\nThe content above contains {len(texts)} separate documents, each starting with a "
+            f"<<DOC n>> marker. Return a JSON array of {len(texts)} such objects, one per document, in the same order."
+        )
+    
     def _parse_with_rules(self, text: str, extract_result: ExtractResult, source_url: str) -> ParsedOpportunity:
         """Rule-based parsing as fallback"""
         try:
             logger.info("🔧 Using rule-based PDF parsing")
             
-            # Initialize with defaults
-            parsed_data = {
-                "title": "Unknown",
-                "donor": "Unknown",
-                "summary": "No summary available",
-                "amount": "Unknown",
-                "deadline": "Unknown",
-                "location": "Unknown",
-                "eligibility": [],
-                "themes": [],
-                "duration": None,
-                "how_to_apply": None,
-                "opportunity_url": source_url,
-                "published_date": None,
-                "contact_info": None
-            }
-            
             # Extract title (look for first line that looks like a title)
-            lines = text.split('\n')
-            for line in lines[:10]:  # Check first 10 lines
+            title = "Unknown"
+            for line in text.split('\n', 10)[:10]:  # Check first 10 lines (split no further)
                 line = line.strip()
-                if len(line) > 10 and len(line) < 200 and not line.islower():
-                    if any(word in line.lower() for word in ['grant', 'funding', 'opportunity', 'program', 'award']):
-                        parsed_data["title"] = line
+                if 10 < len(line) < 200 and not line.islower():
+                    line_lower = line.lower()
+                    if any(word in line_lower for word in _TITLE_WORDS):
+                        title = line
                         break
             
+            # Find every cue phrase in one pass; patterns whose cues are absent are skipped
+            # Lower-case ASCII text once; casefolding is then the same as lower() and offsets line up
+            text_lower = text.lower() if text.isascii() else None
+            cues = _find_cues(text, text_lower)
+            
             # Extract donor (look for common patterns)
-            donor_patterns = [
-                r'(?:funded by|sponsored by|provided by|grant from)\s*[:.]?\s*([^.\n]+)',
-                r'(?:organization|agency|foundation|institution)\s*[:.]?\s*([^.\n]+)',
-                r'([A-Z][A-Z\s&]+(?:Foundation|Institute|Agency|Department|Ministry|Council))'
-            ]
-            
-            for pattern in donor_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    donor = match.group(1).strip()
-                    if len(donor) > 3 and donor.lower() != "unknown":
-                        parsed_data["donor"] = donor
-                        break
+            donor = _first_valid_match(_cued(_DONOR_RULES, cues), text, lambda value: len(value) > 3 and value.lower() != "unknown")
             
             # Extract amount (look for currency patterns)
-            amount_patterns = [
-                r'(\$[\d,]+(?:\.\d{2})?(?:\s*-\s*\$[\d,]+(?:\.\d{2})?)?)',
-                r'(£[\d,]+(?:\.\d{2})?(?:\s*-\s*£[\d,]+(?:\.\d{2})?)?)',
-                r'(€[\d,]+(?:\.\d{2})?(?:\s*-\s*€[\d,]+(?:\.\d{2})?)?)',
-                r'([\d,]+(?:\.\d{2})?\s*(?:USD|GBP|EUR|dollars?|pounds?|euros?))',
-                r'(up to\s+[\d,]+(?:\.\d{2})?\s*(?:USD|GBP|EUR|dollars?|pounds?|euros?))'
-            ]
-            
-            for pattern in amount_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    amount = match.group(1).strip()
-                    if amount.lower() != "unknown":
-                        parsed_data["amount"] = amount
-                        break
+            amount = _first_valid_match(_AMOUNT_PATTERNS, text, lambda value: value.lower() != "unknown")
+            if amount is None:
+                amount = "Unknown"
             
             # Extract deadline (look for date patterns)
-            deadline_patterns = [
-                r'(?:deadline|closing date|due date|apply by|submission deadline)\s*[:.]?\s*([^.\n]+)',
-                r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})',
-                r'(\d{1,2}/\d{1,2}/\d{4})',
-                r'(\d{4}-\d{2}-\d{2})'
-            ]
-            
-            for pattern in deadline_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    deadline = match.group(1).strip()
-                    if deadline.lower() != "unknown":
-                        parsed_data["deadline"] = deadline
-                        break
+            deadline = _first_valid_match(_cued(_DEADLINE_RULES, cues), text, lambda value: value.lower() != "unknown")
             
             # Extract location (look for geographic patterns)
-            location_patterns = [
-                r'(?:eligible areas?|geographic scope|location|region)\s*[:.]?\s*([^.\n]+)',
-                r'(?:open to|available in|restricted to)\s*([^.\n]+)',
-                r'(United States|UK|United Kingdom|Canada|Australia|Global|Worldwide|International)'
-            ]
-            
-            for pattern in location_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    location = match.group(1).strip()
-                    if location.lower() != "unknown":
-                        parsed_data["location"] = location
-                        break
+            location = _first_valid_match(_cued(_LOCATION_RULES, cues), text, lambda value: value.lower() != "unknown")
+            if location is None:
+                location = "Unknown"
             
             # Extract eligibility (look for eligibility sections)
-            eligibility_sections = re.findall(
-                r'(?:eligibility|who can apply|requirements|criteria|qualifications?)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)',
-                text,
-                re.IGNORECASE
-            )
+            eligibility = []
+            eligibility_text = "eligibility" in cues and _search_group(_ELIGIBILITY_RES, text, text_lower)
             
-            if eligibility_sections:
-                eligibility_text = eligibility_sections[0]
+            if eligibility_text:
                 # Split into bullet points or sentences
-                eligibility_items = re.split(r'[•\-\*]|\d+\.', eligibility_text)
-                parsed_data["eligibility"] = [
+                eligibility_items = _BULLET_SPLIT_RE.split(eligibility_text)
+                eligibility = [
                     item.strip() for item in eligibility_items 
                     if item.strip() and len(item.strip()) > 5
                 ][:5]  # Limit to 5 items
             
             # Extract themes (look for focus areas)
-            theme_patterns = [
-                r'(?:focus areas?|themes?|priorities?|sectors?|topics?)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)',
-                r'(?:supporting|funding|grants? for)\s+([^.\n]+)'
-            ]
-            
-            for pattern in theme_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+            themes = set()
+            for pattern in _cued(_THEME_RULES, cues):
+                match = pattern.search(text)
                 if match:
                     themes_text = match.group(1)
                     # Extract individual themes
-                    themes = re.findall(r'\b(?:education|health|environment|technology|arts|culture|social|economic|youth|community|research|innovation)\b', themes_text, re.IGNORECASE)
+                    themes = {word for word in _WORD_RE.findall(themes_text) if word.lower() in _THEME_VOCAB}
                     if themes:
-                        parsed_data["themes"] = list(set(themes))  # Remove duplicates
                         break
             
             # Extract duration
-            duration_match = re.search(
-                r'(?:duration|project length|funding period|timeline)\s*[:.]?\s*([^.\n]+)',
-                text,
-                re.IGNORECASE
-            )
-            if duration_match:
-                parsed_data["duration"] = duration_match.group(1).strip()
+            duration = None
+            duration_text = "duration" in cues and _search_group(_DURATION_RES, text, text_lower)
+            if duration_text:
+                duration = duration_text.strip()
             
             # Extract how to apply
-            apply_match = re.search(
-                r'(?:how to apply|application process|submission|apply)\s*[:.]?\s*([^.\n]+(?:\n[^.\n]+)*)',
-                text,
-                re.IGNORECASE
-            )
-            if apply_match:
-                apply_text = apply_match.group(1).strip()
+            how_to_apply = None
+            apply_text = "apply" in cues and _search_group(_APPLY_RES, text, text_lower)
+            if apply_text:
+                how_to_apply = apply_text.strip()
                 # Truncate if too long
-                if len(apply_text) > 200:
-                    apply_text = apply_text[:200] + "..."
-                parsed_data["how_to_apply"] = apply_text
+                if len(how_to_apply) > 200:
+                    how_to_apply = how_to_apply[:200] + "..."
             
             # Extract contact info
-            contact_match = re.search(
-                r'(?:contact|enquiries?|questions?|email|phone)\s*[:.]?\s*([^.\n]+)',
-                text,
-                re.IGNORECASE
-            )
-            if contact_match:
-                parsed_data["contact_info"] = contact_match.group(1).strip()
+            contact_info = None
+            contact_text = "contact" in cues and _search_group(_CONTACT_RES, text, text_lower)
+            if contact_text:
+                contact_info = contact_text.strip()
             
             # Create summary from extracted data
             summary_parts = []
-            if parsed_data["title"] != "Unknown":
-                summary_parts.append(parsed_data["title"])
-            if parsed_data["amount"] != "Unknown":
-                summary_parts.append(f"Funding: {parsed_data['amount']}")
-            if parsed_data["location"] != "Unknown":
-                summary_parts.append(f"Location: {parsed_data['location']}")
-            
-            if summary_parts:
-                parsed_data["summary"] = ". ".join(summary_parts)
-            
-            # Convert to ParsedOpportunity
-            return self._convert_to_parsed_opportunity(parsed_data, extract_result, source_url)
+            if title != "Unknown":
+                summary_parts.append(title)
+            if amount != "Unknown":
+                summary_parts.append(f"Funding: {amount}")
+            if location != "Unknown":
+                summary_parts.append(f"Location: {location}")
+            
+            # Build the result directly; empty required values fall back like _convert_to_parsed_opportunity
+            opportunity = ParsedOpportunity(
+                title=title,
+                donor=donor or "Unknown",
+                summary=". ".join(summary_parts) if summary_parts else "No summary available",
+                amount=amount or "Unknown",
+                deadline=deadline or "Unknown",
+                location=location or "Unknown",
+                eligibility=eligibility,
+                themes=list(themes),  # Set removes duplicates
+                duration=duration,
+                how_to_apply=how_to_apply,
+                opportunity_url=source_url,
+                contact_info=contact_info,
+                source="pdf",
+                confidence_score=extract_result.confidence,
+                extraction_engine=extract_result.engine,
+                pages_extracted=extract_result.pages
+            )
+            self._log_parsed(opportunity)
+            return opportunity
             
         except Exception as e:
             logger.error(f"❌ Rule-based parsing failed: {e}")
@@ -329,28 +747,31 @@ class PDFToGoldParser:
                 pages_extracted=extract_result.pages
             )
             
-            logger.info(f"✅ Successfully parsed PDF to gold-standard schema")
-            logger.info(f"   Title: {opportunity.title[:50]}...")
-            logger.info(f"   Donor: {opportunity.donor}")
-            logger.info(f"   Confidence: {opportunity.confidence_score:.2f}")
-            logger.info(f"   Engine: {opportunity.extraction_engine}")
-            
+            self._log_parsed(opportunity)
             return opportunity
             
         except Exception as e:
             logger.error(f"❌ Failed to convert to ParsedOpportunity: {e}")
             raise PDFParseError(f"Conversion failed: {str(e)}")
     
+    def _log_parsed(self, opportunity: ParsedOpportunity):
+        """Log a summary of a successfully parsed opportunity"""
+        logger.info(f"✅ Successfully parsed PDF to gold-standard schema")
+        logger.info(f"   Title: {opportunity.title[:50]}...")
+        logger.info(f"   Donor: {opportunity.donor}")
+        logger.info(f"   Confidence: {opportunity.confidence_score:.2f}")
+        logger.info(f"   Engine: {opportunity.extraction_engine}")
+    
     def _sanitize_text(self, text: str) -> str:
         """Sanitize and truncate extracted text"""
         if not text:
             return ""
         
         # Remove control characters
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+        text = text.translate(_CTRL_TABLE)
         
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Normalize whitespace (str.split() splits on the same Unicode whitespace as \s)
+        text = " ".join(text.split())
         
         # Truncate if too long
         if len(text) > self.max_text_length:
@@ -370,22 +791,15 @@ class PDFToGoldParser:
             "pages_extracted": opportunity.pages_extracted
         }
         
-        # Check required fields
-        required_fields = ["title", "donor", "summary", "amount", "deadline", "location", "eligibility", "themes"]
-        for field in required_fields:
+        # Check required fields: empty values are missing, placeholder strings also low quality
+        for field in _REQUIRED_FIELDS:
             value = getattr(opportunity, field)
-            if not value or (isinstance(value, str) and value.lower() in ['unknown', 'n/a', '']):
-                validation_result["missing_required"].append(field)
-                validation_result["is_valid"] = False
-            elif isinstance(value, list) and len(value) == 0:
-                validation_result["missing_required"].append(field)
-                validation_result["is_valid"] = False
-        
-        # Check for low quality data
-        for field in required_fields:
-            value = getattr(opportunity, field)
-            if isinstance(value, str) and value.lower() in ['unknown', 'n/a', '']:
+            low_quality = isinstance(value, str) and value.lower() in _PLACEHOLDER_VALUES
+            if low_quality:
                 validation_result["low_quality_fields"].append(field)
+            if low_quality or not value:
+                validation_result["missing_required"].append(field)
+        validation_result["is_valid"] = not validation_result["missing_required"]
         
         # Log validation results
         if validation_result["missing_required"]:
@@ -404,3 +818,8 @@ class PDFToGoldParser:
 # Global parser instance
 pdf_to_gold_parser = PDFToGoldParser()
 
+def _parse_in_worker(job: Tuple[ExtractResult, Optional[str]]) -> ParsedOpportunity:
+    """Process-pool entry point for parse_many_to_gold_standard"""
+    extract_result, source_url = job
+    return pdf_to_gold_parser.parse_to_gold_standard(extract_result, source_url)
+
@@ -1,14 +1,26 @@
 import os
 import yaml
 import logging
-from typing import Dict, Any, Optional, List
+import soupsieve
+import functools
+from typing import Dict, Any, Optional, List, Tuple
 from urllib.parse import urlparse
 from pathlib import Path
 import random
 import time
+import asyncio
+from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C loader parses several times faster; PyYAML builds without it fall back to Python
+_YAMLLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=4096)
+def _url_domain(url: str) -> str:
+    """Lower-cased host of a URL without its www. prefix (memoized: crawls repeat URLs)"""
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
 class SiteProfile:
     """Configuration profile for a specific website domain"""
     
@@ -19,11 +31,28 @@ class SiteProfile:
         self.retry = config.get("retry", {})
         self.rate_limit = config.get("rate_limit", {})
         self.user_agents = config.get("user_agents", [])
+        # Selector lists are fixed per profile, so join/compile them once rather than per page
+        self._joined_selectors = {field: ", ".join(selectors) for field, selectors in self.selectors.items()}
+        self._compiled_selectors: Dict[str, List[Any]] = {}
     
     def get_selector(self, field: str) -> List[str]:
         """Get selectors for a specific field with fallback"""
         return self.selectors.get(field, [])
     
+    def get_joined_selector(self, field: str) -> str:
+        """All selectors for a field as one selector group, so one DOM query matches any of them.
+        
+        Matches come back in document order, not selector priority order.
+        """
+        return self._joined_selectors.get(field, "")
+    
+    def get_compiled_selectors(self, field: str) -> List[Any]:
+        """Selectors for a field compiled with soupsieve for BeautifulSoup, in priority order"""
+        compiled = self._compiled_selectors.get(field)
+        if compiled is None:
+            compiled = self._compiled_selectors[field] = [soupsieve.compile(selector) for selector in self.get_selector(field)]
+        return compiled
+    
     def get_wait_time(self, wait_type: str) -> int:
         """Get wait time in milliseconds for a specific wait type"""
         return self.waits.get(wait_type, 2000)
@@ -68,6 +97,9 @@ class SiteProfileRegistry:
         self.profiles: Dict[str, SiteProfile] = {}
         self.default_profile: Optional[SiteProfile] = None
         self.last_request_time: Dict[str, float] = {}
+        self._domain_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Domain -> matching profile key (or None), cleared whenever profiles are reloaded
+        self._resolve_domain = functools.lru_cache(maxsize=4096)(self._match_domain)
         self._load_profiles()
     
     def _load_profiles(self):
@@ -81,7 +113,7 @@ class SiteProfileRegistry:
                 return
             
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_YAMLLoader)
             
             # Load default profile
             if "default" in config:
@@ -140,25 +172,27 @@ class SiteProfileRegistry:
         self.default_profile = SiteProfile(default_config)
         logger.info("✅ Default site profile created")
     
+    def _match_domain(self, domain: str) -> Optional[str]:
+        """Key of the profile for a normalized domain, or None for the default profile"""
+        # Try to find exact domain match
+        if domain in self.profiles:
+            return domain
+        
+        # Try to find partial domain match (e.g., gov.uk for subdomain.gov.uk)
+        for profile_domain in self.profiles.keys():
+            if domain.endswith(profile_domain) or profile_domain.endswith(domain):
+                return profile_domain
+        return None
+    
     def get_profile(self, url: str) -> SiteProfile:
         """Get site profile for a specific URL"""
         try:
-            domain = urlparse(url).netloc.lower()
-            
-            # Remove www. prefix for matching
-            if domain.startswith("www."):
-                domain = domain[4:]
-            
-            # Try to find exact domain match
-            if domain in self.profiles:
-                logger.debug(f"🎯 Using site profile for {domain}")
-                return self.profiles[domain]
+            domain = _url_domain(url)
+            profile_domain = self._resolve_domain(domain)
             
-            # Try to find partial domain match (e.g., gov.uk for subdomain.gov.uk)
-            for profile_domain in self.profiles.keys():
-                if domain.endswith(profile_domain) or profile_domain.endswith(domain):
-                    logger.debug(f"🎯 Using site profile for {profile_domain} (partial match for {domain})")
-                    return self.profiles[profile_domain]
+            if profile_domain is not None:
+                logger.debug(f"🎯 Using site profile for {profile_domain} ({domain})")
+                return self.profiles[profile_domain]
             
             # Fall back to default profile
             logger.debug(f"🎯 Using default site profile for {domain}")
@@ -168,30 +202,49 @@ class SiteProfileRegistry:
             logger.error(f"❌ Error getting site profile for {url}: {e}")
             return self.default_profile
     
+    def _rate_limit_delay(self, url: str) -> Tuple[str, float]:
+        """Return (domain, seconds to wait before the next request to it)"""
+        domain = _url_domain(url)
+        
+        profile = self.get_profile(url)
+        rate_config = profile.get_rate_limit_config()
+        
+        # Monotonic clock: wall-clock adjustments must not stall or skip the limiter
+        last_request = self.last_request_time.get(domain)
+        if last_request is None:
+            return domain, 0.0
+        
+        # Calculate required delay
+        min_interval = 1.0 / rate_config["requests_per_second"]
+        time_since_last = time.monotonic() - last_request
+        return domain, max(0.0, min_interval - time_since_last)
+    
     def enforce_rate_limit(self, url: str):
         """Enforce rate limiting for a specific URL"""
         try:
-            domain = urlparse(url).netloc.lower()
-            if domain.startswith("www."):
-                domain = domain[4:]
-            
-            profile = self.get_profile(url)
-            rate_config = profile.get_rate_limit_config()
-            
-            current_time = time.time()
-            last_request = self.last_request_time.get(domain, 0)
-            
-            # Calculate required delay
-            min_interval = 1.0 / rate_config["requests_per_second"]
-            time_since_last = current_time - last_request
-            
-            if time_since_last < min_interval:
-                sleep_time = min_interval - time_since_last
+            domain, sleep_time = self._rate_limit_delay(url)
+            if sleep_time > 0:
                 logger.debug(f"⏱️ Rate limiting: sleeping {sleep_time:.2f}s for {domain}")
                 time.sleep(sleep_time)
             
             # Update last request time
-            self.last_request_time[domain] = time.time()
+            self.last_request_time[domain] = time.monotonic()
+            
+        except Exception as e:
+            logger.error(f"❌ Error enforcing rate limit for {url}: {e}")
+    
+    async def enforce_rate_limit_async(self, url: str):
+        """Async enforce_rate_limit: waits without blocking the event loop, so other domains proceed"""
+        try:
+            domain = _url_domain(url)
+            # Requests to one domain queue on its lock; other domains are not held up
+            async with self._domain_locks[domain]:
+                domain, sleep_time = self._rate_limit_delay(url)
+                if sleep_time > 0:
+                    logger.debug(f"⏱️ Rate limiting: sleeping {sleep_time:.2f}s for {domain}")
+                    await asyncio.sleep(sleep_time)
+                
+                self.last_request_time[domain] = time.monotonic()
             
         except Exception as e:
             logger.error(f"❌ Error enforcing rate limit for {url}: {e}")
@@ -261,6 +314,7 @@ class SiteProfileRegistry:
         logger.info("🔄 Reloading site profiles...")
         self.profiles.clear()
         self.last_request_time.clear()
+        self._resolve_domain.cache_clear()
         self._load_profiles()
         logger.info("✅ Site profiles reloaded")
     
@@ -1,14 +1,41 @@
+import io
 import os
+import posixpath
+import base64
+import threading
+import mmap
+import asyncio
 import logging
 import hashlib
-from typing import Optional, Union
+import shutil
+import stat
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, BinaryIO, Union
 from pathlib import Path
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import HTTPException, status
 
 logger = logging.getLogger(__name__)
 
+# One boto3 session per process; the client built from it is thread-safe and is shared
+# by every caller (and the async methods' worker threads) so its connection pool is reused.
+# Don't create clients per request.
+_SESSION = boto3.session.Session()
+
+# Characters replaced with '_' in storage paths
+_DANGEROUS_CHARS = ('<', '>', ':', '"', '|', '?', '*')
+
+# Number of recent S3 uploads remembered (key -> content digest, ETag) to skip identical re-uploads
+RECENT_UPLOADS_MAX = 1024
+
+# exists_many LISTs an S3 directory only when it holds at least this many of the keys asked about
+EXISTS_MANY_LIST_MIN_KEYS = 8
+
 class StorageError(Exception):
     """Base exception for storage operations"""
     pass
@@ -19,8 +46,25 @@ class StorageService:
     def __init__(self):
         self.backend_type = "local"  # Default to local
         self.base_path = None
+        self._base_str = None
         self.s3_client = None
         self.s3_bucket = None
+        # One shared (thread-safe) client serves the async methods' worker threads
+        self.max_pool_connections = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+        # Uploads at or above this size go up as parallel multipart parts
+        self.multipart_threshold = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8")) * 1024 * 1024
+        # Bucket encryption support is probed once and re-checked after this many seconds
+        self.encryption_check_ttl = float(os.getenv("S3_ENCRYPTION_CHECK_TTL", "300"))
+        self._encryption_supported = False
+        self._encryption_checked_at = None
+        self._recent_uploads: "OrderedDict[str, tuple]" = OrderedDict()
+        self._recent_uploads_lock = threading.Lock()
+        self.transfer_config = TransferConfig(
+            multipart_threshold=self.multipart_threshold,
+            multipart_chunksize=self.multipart_threshold,
+            max_concurrency=int(os.getenv("S3_MULTIPART_CONCURRENCY", "8")),
+            use_threads=True
+        )
         
         # Check for S3 configuration
         s3_endpoint = os.getenv("S3_ENDPOINT")
@@ -42,12 +86,21 @@ class StorageService:
     def _init_s3_backend(self, endpoint: str, bucket: str, access_key: str, secret_key: str):
         """Initialize S3-compatible backend"""
         try:
-            self.s3_client = boto3.client(
+            self.s3_client = _SESSION.client(
                 's3',
                 endpoint_url=endpoint,
                 aws_access_key_id=access_key,
                 aws_secret_access_key=secret_key,
-                region_name='us-east-1'  # Default region
+                region_name='us-east-1',  # Default region
+                config=Config(
+                    max_pool_connections=self.max_pool_connections,
+                    tcp_keepalive=True,
+                    connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT", "3")),
+                    read_timeout=float(os.getenv("S3_READ_TIMEOUT", "30")),
+                    # Adaptive mode backs off client-side when S3 signals throttling (503 SlowDown)
+                    retries={'max_attempts': int(os.getenv("S3_MAX_ATTEMPTS", "10")), 'mode': 'adaptive'},
+                    signature_version='s3v4'
+                )
             )
             
             # Test connection
@@ -55,6 +108,7 @@ class StorageService:
             
             self.s3_bucket = bucket
             self.backend_type = "s3"
+            self._supports_encryption()
             logger.info("✅ S3 backend connection successful")
             
         except (ClientError, NoCredentialsError) as e:
@@ -80,6 +134,7 @@ class StorageService:
         # Ensure directory exists
         try:
             self.base_path.mkdir(parents=True, exist_ok=True)
+            self._base_str = str(self.base_path)
             logger.info(f"📁 Local storage directory ready: {self.base_path}")
         except Exception as e:
             logger.warning(f"⚠️ Failed to create primary storage directory {self.base_path}: {e}")
@@ -88,6 +143,7 @@ class StorageService:
             try:
                 fallback_path.mkdir(parents=True, exist_ok=True)
                 self.base_path = fallback_path
+                self._base_str = str(fallback_path)
                 logger.warning(f"⚠️ Using fallback storage directory: {self.base_path}")
             except Exception as fallback_error:
                 logger.error(f"❌ Both primary and fallback storage failed. Primary: {e}, Fallback: {fallback_error}")
@@ -102,10 +158,10 @@ class StorageService:
         if clean_path.startswith('/') or ':' in clean_path:
             clean_path = clean_path.lstrip('/').split(':', 1)[-1]
         
-        # Remove any remaining dangerous characters
-        dangerous_chars = ['<', '>', ':', '"', '|', '?', '*']
-        for char in dangerous_chars:
-            clean_path = clean_path.replace(char, '_')
+        # Remove any remaining dangerous characters; only rebuild the string for those present
+        for char in _DANGEROUS_CHARS:
+            if char in clean_path:
+                clean_path = clean_path.replace(char, '_')
         
         return clean_path
     
@@ -124,36 +180,152 @@ class StorageService:
             clean_path = self._validate_path(path)
             
             if self.backend_type == "local":
-                full_path = self.base_path / clean_path
-                full_path.parent.mkdir(parents=True, exist_ok=True)
+                full_path = os.path.join(self._base_str, clean_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
                 
                 with open(full_path, 'wb') as f:
                     f.write(data)
                 
                 logger.info(f"💾 Saved {len(data)} bytes to local path: {full_path}")
-                return str(full_path)
+                return full_path
                 
             else:  # S3
-                try:
-                    self.s3_client.put_object(
+                s3_uri = f"s3://{self.s3_bucket}/{clean_path}"
+                digest = hashlib.sha256(data).digest()
+                if self._upload_unchanged(clean_path, digest, len(data)):
+                    # Same bytes already written to this key by this process (e.g. a retried run)
+                    logger.info(f"💾 Skipped re-upload of unchanged {len(data)} bytes: {s3_uri}")
+                    return s3_uri
+                
+                if len(data) >= self.multipart_threshold:
+                    # Parts are uploaded concurrently by the transfer manager's thread pool
+                    self.s3_client.upload_fileobj(
+                        io.BytesIO(data),
+                        self.s3_bucket,
+                        clean_path,
+                        ExtraArgs=self._upload_extra_args(),
+                        Config=self.transfer_config
+                    )
+                    # The transfer manager does not return the multipart ETag
+                    etag = self.s3_client.head_object(Bucket=self.s3_bucket, Key=clean_path)['ETag']
+                else:
+                    # Content-MD5 lets S3 reject a body corrupted in transit
+                    etag = self.s3_client.put_object(
                         Bucket=self.s3_bucket,
                         Key=clean_path,
                         Body=data,
-                        ServerSideEncryption='AES256' if self._supports_encryption() else None
-                    )
-                    
-                    # Return S3 URI
-                    s3_uri = f"s3://{self.s3_bucket}/{clean_path}"
-                    logger.info(f"💾 Saved {len(data)} bytes to S3: {s3_uri}")
-                    return s3_uri
-                    
-                except ClientError as e:
-                    logger.error(f"❌ S3 upload failed: {e}")
-                    raise StorageError(f"S3 upload failed: {e}")
-                    
+                        ContentMD5=base64.b64encode(hashlib.md5(data, usedforsecurity=False).digest()).decode('ascii'),
+                        **self._upload_extra_args()
+                    )['ETag']
+                self._remember_upload(clean_path, digest, etag)
+                
+                # Return S3 URI
+                logger.info(f"💾 Saved {len(data)} bytes to S3: {s3_uri}")
+                return s3_uri
+                
+        except ClientError as e:
+            logger.error(f"❌ S3 upload failed: {e}")
+            raise StorageError(f"S3 upload failed: {e}") from e
+        except Exception as e:
+            logger.error(f"❌ Storage save failed: {e}")
+            raise StorageError(f"Failed to save data: {e}") from e
+    
+    def save_stream(self, path: str, src: BinaryIO) -> str:
+        """Save a readable binary file object to storage without buffering it whole in memory.
+        Copies from its current position; returns canonical path/URI"""
+        try:
+            clean_path = self._validate_path(path)
+            
+            if self.backend_type == "local":
+                full_path = os.path.join(self._base_str, clean_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                
+                try:
+                    with open(full_path, 'wb') as dst:
+                        src_fd = self._sendfile_source_fd(src)
+                        
+                        if src_fd is not None:
+                            # Kernel-side copy between the two files; no user-space buffers
+                            offset = src.tell()
+                            remaining = os.fstat(src_fd).st_size - offset
+                            while remaining > 0:
+                                sent = os.sendfile(dst.fileno(), src_fd, offset, remaining)
+                                if sent == 0:
+                                    break
+                                offset += sent
+                                remaining -= sent
+                            src.seek(offset)
+                        else:
+                            shutil.copyfileobj(src, dst, length=1 << 20)
+                        size = dst.tell()
+                except BaseException:
+                    # Don't leave a truncated file behind
+                    try:
+                        os.remove(full_path)
+                    except OSError:
+                        pass
+                    raise
+                
+                logger.info(f"💾 Streamed {size} bytes to local path: {full_path}")
+                return full_path
+                
+            else:  # S3
+                self._forget_upload(clean_path)
+                self.s3_client.upload_fileobj(
+                    src,
+                    self.s3_bucket,
+                    clean_path,
+                    ExtraArgs=self._upload_extra_args(),
+                    Config=self.transfer_config
+                )
+                
+                s3_uri = f"s3://{self.s3_bucket}/{clean_path}"
+                logger.info(f"💾 Streamed upload to S3: {s3_uri}")
+                return s3_uri
+                
+        except ClientError as e:
+            logger.error(f"❌ S3 upload failed: {e}")
+            raise StorageError(f"S3 upload failed: {e}") from e
+        except Exception as e:
+            logger.error(f"❌ Storage save failed: {e}")
+            raise StorageError(f"Failed to save data: {e}") from e
+    
+    def save_path(self, src_path: str, path: str) -> str:
+        """Save a file already on disk to storage without reading it into Python memory;
+        returns canonical path/URI"""
+        try:
+            clean_path = self._validate_path(path)
+            
+            if self.backend_type == "local":
+                full_path = os.path.join(self._base_str, clean_path)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                
+                # copyfile uses the kernel's sendfile fast path on Linux
+                shutil.copyfile(src_path, full_path)
+                
+                logger.info(f"💾 Copied {src_path} to local path: {full_path}")
+                return full_path
+                
+            else:  # S3
+                self._forget_upload(clean_path)
+                self.s3_client.upload_file(
+                    src_path,
+                    self.s3_bucket,
+                    clean_path,
+                    ExtraArgs=self._upload_extra_args(),
+                    Config=self.transfer_config
+                )
+                
+                s3_uri = f"s3://{self.s3_bucket}/{clean_path}"
+                logger.info(f"💾 Uploaded {src_path} to S3: {s3_uri}")
+                return s3_uri
+                
+        except ClientError as e:
+            logger.error(f"❌ S3 upload failed: {e}")
+            raise StorageError(f"S3 upload failed: {e}") from e
         except Exception as e:
             logger.error(f"❌ Storage save failed: {e}")
-            raise StorageError(f"Failed to save data: {e}")
+            raise StorageError(f"Failed to save data: {e}") from e
     
     def open(self, path: str) -> bytes:
         """Read bytes from storage"""
@@ -161,10 +333,11 @@ class StorageService:
             clean_path = self._validate_path(path)
             
             if self.backend_type == "local":
-                full_path = self.base_path / clean_path
-                if not full_path.exists():
+                full_path = os.path.join(self._base_str, clean_path)
+                if not os.path.exists(full_path):
                     raise FileNotFoundError(f"File not found: {full_path}")
                 
+                # Copying out of a memory map would cost more than a read; use open_mmap for zero-copy access
                 with open(full_path, 'rb') as f:
                     data = f.read()
                 
@@ -172,18 +345,37 @@ class StorageService:
                 return data
                 
             else:  # S3
-                try:
-                    response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=clean_path)
-                    data = response['Body'].read()
-                    
-                    logger.info(f"📖 Read {len(data)} bytes from S3: {clean_path}")
-                    return data
-                    
-                except ClientError as e:
-                    if e.response['Error']['Code'] == 'NoSuchKey':
-                        raise FileNotFoundError(f"File not found in S3: {clean_path}")
-                    raise StorageError(f"S3 read failed: {e}")
-                    
+                response = self.s3_client.get_object(Bucket=self.s3_bucket, Key=clean_path)
+                data = response['Body'].read()
+                
+                logger.info(f"📖 Read {len(data)} bytes from S3: {clean_path}")
+                return data
+                
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                message = f"File not found in S3: {clean_path}"
+            else:
+                message = f"S3 read failed: {e}"
+            logger.error(f"❌ Storage read failed: {message}")
+            raise StorageError(f"Failed to read data: {message}") from e
+        except Exception as e:
+            logger.error(f"❌ Storage read failed: {e}")
+            raise StorageError(f"Failed to read data: {e}") from e
+    
+    def open_mmap(self, path: str) -> memoryview:
+        """Read-only, zero-copy view of a stored file (memory-mapped on the local backend).
+        The mapping is released once the view and its slices are garbage collected."""
+        if self.backend_type != "local":
+            return memoryview(self.open(path))
+        
+        try:
+            full_path = os.path.join(self._base_str, self._validate_path(path))
+            with open(full_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return memoryview(b"")
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            logger.info(f"📖 Mapped {len(mm)} bytes from local path: {full_path}")
+            return memoryview(mm)
         except Exception as e:
             logger.error(f"❌ Storage read failed: {e}")
             raise StorageError(f"Failed to read data: {e}")
@@ -194,76 +386,204 @@ class StorageService:
             clean_path = self._validate_path(path)
             
             if self.backend_type == "local":
-                full_path = self.base_path / clean_path
-                return full_path.exists()
+                return os.path.exists(os.path.join(self._base_str, clean_path))
                 
             else:  # S3
-                try:
-                    self.s3_client.head_object(Bucket=self.s3_bucket, Key=clean_path)
-                    return True
-                except ClientError as e:
-                    if e.response['Error']['Code'] == '404':
-                        return False
-                    raise StorageError(f"S3 existence check failed: {e}")
-                    
+                self.s3_client.head_object(Bucket=self.s3_bucket, Key=clean_path)
+                return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == '404':
+                return False
+            logger.error(f"❌ S3 existence check failed: {e}")
+            return False
         except Exception as e:
             logger.error(f"❌ Storage existence check failed: {e}")
             return False
     
+    def exists_many(self, paths: List[str]) -> Dict[str, bool]:
+        """Check several files at once: one directory scan per local folder; on S3, one delimited
+        LIST per directory holding enough of the keys, concurrent HEAD requests for the rest"""
+        try:
+            clean_paths = {path: self._validate_path(path) for path in paths}
+            
+            if self.backend_type == "local":
+                listings = {}
+                result = {}
+                for path, clean_path in clean_paths.items():
+                    full_path = os.path.join(self._base_str, clean_path)
+                    directory, name = os.path.split(full_path)
+                    if name in ('', '.'):
+                        result[path] = os.path.exists(full_path)
+                        continue
+                    if directory not in listings:
+                        try:
+                            with os.scandir(directory) as entries:
+                                listings[directory] = {entry.name for entry in entries}
+                        except OSError:
+                            listings[directory] = set()
+                    result[path] = name in listings[directory]
+                return result
+                
+            else:  # S3
+                # A LIST is bounded to one directory (Delimiter='/'), never a shared stub
+                # prefix that could span the whole bucket
+                keys_by_dir: Dict[str, List[str]] = {}
+                for clean_path in set(clean_paths.values()):
+                    keys_by_dir.setdefault(posixpath.dirname(clean_path), []).append(clean_path)
+                
+                present = set()
+                head_keys = []
+                for directory, keys in keys_by_dir.items():
+                    if not directory or len(keys) < EXISTS_MANY_LIST_MIN_KEYS:
+                        # Bucket root (unbounded listing) or too few keys to beat their HEADs
+                        head_keys.extend(keys)
+                        continue
+                    paginator = self.s3_client.get_paginator('list_objects_v2')
+                    for page in paginator.paginate(Bucket=self.s3_bucket, Prefix=directory + '/', Delimiter='/'):
+                        present.update(obj['Key'] for obj in page.get('Contents', ()))
+                
+                if head_keys:
+                    workers = min(len(head_keys), self.max_pool_connections)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        found = executor.map(self._s3_object_exists, head_keys)
+                        present.update(key for key, exists in zip(head_keys, found) if exists)
+                return {path: clean_path in present for path, clean_path in clean_paths.items()}
+                
+        except Exception as e:
+            logger.error(f"❌ Storage existence check failed: {e}")
+            return {path: False for path in paths}
+    
+    def _s3_object_exists(self, key: str) -> bool:
+        """HEAD one S3 key: False if it is missing, other errors are raised"""
+        try:
+            self.s3_client.head_object(Bucket=self.s3_bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == '404':
+                return False
+            raise
+    
     def delete(self, path: str) -> None:
         """Delete file from storage"""
         try:
             clean_path = self._validate_path(path)
             
             if self.backend_type == "local":
-                full_path = self.base_path / clean_path
-                if full_path.exists():
-                    full_path.unlink()
+                full_path = os.path.join(self._base_str, clean_path)
+                try:
+                    os.unlink(full_path)
                     logger.info(f"🗑️ Deleted local file: {full_path}")
+                except FileNotFoundError:
+                    pass
                 
             else:  # S3
-                try:
-                    self.s3_client.delete_object(Bucket=self.s3_bucket, Key=clean_path)
-                    logger.info(f"🗑️ Deleted S3 file: {clean_path}")
-                except ClientError as e:
-                    logger.error(f"❌ S3 delete failed: {e}")
-                    raise StorageError(f"S3 delete failed: {e}")
-                    
+                self._forget_upload(clean_path)
+                self.s3_client.delete_object(Bucket=self.s3_bucket, Key=clean_path)
+                logger.info(f"🗑️ Deleted S3 file: {clean_path}")
+        except ClientError as e:
+            logger.error(f"❌ S3 delete failed: {e}")
+            raise StorageError(f"S3 delete failed: {e}") from e
         except Exception as e:
             logger.error(f"❌ Storage delete failed: {e}")
-            raise StorageError(f"Failed to delete file: {e}")
+            raise StorageError(f"Failed to delete file: {e}") from e
+    
+    @staticmethod
+    def _sendfile_source_fd(src: BinaryIO) -> Optional[int]:
+        """File descriptor of src if it is a seekable regular file (sendfile can copy from it), else None"""
+        try:
+            if not src.seekable():
+                return None
+            src_fd = src.fileno()
+            return src_fd if stat.S_ISREG(os.fstat(src_fd).st_mode) else None
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return None
+    
+    def _scan_local_files(self, directory: str, base_len: int, files: list) -> None:
+        """Recursively collect file paths (relative to the storage root) under directory.
+        Like the rglob listing it replaced, symlinked directories are not descended into
+        (no cycles, nothing outside the root) and unreadable subdirectories are skipped"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    try:
+                        self._scan_local_files(entry.path, base_len, files)
+                    except PermissionError:
+                        continue
+                elif entry.is_file():
+                    files.append(entry.path[base_len:])
+    
+    def _upload_unchanged(self, key: str, digest: bytes, size: int) -> bool:
+        """True if this process last wrote exactly this content to key and S3 still holds that
+        object (a HEAD checks its ETag and size, so writes by other workers are not masked)"""
+        with self._recent_uploads_lock:
+            entry = self._recent_uploads.get(key)
+            if entry is None or entry[0] != digest:
+                return False
+            self._recent_uploads.move_to_end(key)
+        try:
+            head = self.s3_client.head_object(Bucket=self.s3_bucket, Key=key)
+        except ClientError:
+            head = None
+        if head is not None and head.get('ETag') == entry[1] and head.get('ContentLength') == size:
+            return True
+        self._forget_upload(key)
+        return False
+    
+    def _remember_upload(self, key: str, digest: bytes, etag: str) -> None:
+        """Record the content digest and ETag of a completed upload (LRU-bounded)"""
+        with self._recent_uploads_lock:
+            self._recent_uploads[key] = (digest, etag)
+            self._recent_uploads.move_to_end(key)
+            if len(self._recent_uploads) > RECENT_UPLOADS_MAX:
+                self._recent_uploads.popitem(last=False)
+    
+    def _forget_upload(self, key: str) -> None:
+        """Drop key from the recent-upload record (it is being overwritten or deleted)"""
+        with self._recent_uploads_lock:
+            self._recent_uploads.pop(key, None)
     
     def _supports_encryption(self) -> bool:
-        """Check if S3 backend supports server-side encryption"""
+        """Check if S3 backend supports server-side encryption (cached for encryption_check_ttl)"""
+        now = time.monotonic()
+        if self._encryption_checked_at is None or now - self._encryption_checked_at >= self.encryption_check_ttl:
+            self._encryption_supported = self._probe_encryption()
+            self._encryption_checked_at = now
+        return self._encryption_supported
+    
+    def _probe_encryption(self) -> bool:
+        """Ask S3 whether the bucket has an encryption configuration"""
         try:
             if self.s3_client:
                 # Try to get bucket encryption configuration
                 self.s3_client.get_bucket_encryption(Bucket=self.s3_bucket)
                 return True
-        except:
+        except Exception:
             pass
         return False
     
+    def _upload_extra_args(self) -> dict:
+        """Extra S3 upload parameters (server-side encryption when the bucket supports it)"""
+        return {'ServerSideEncryption': 'AES256'} if self._supports_encryption() else {}
+    
     def get_file_size(self, path: str) -> int:
         """Get file size in bytes"""
         try:
             clean_path = self._validate_path(path)
             
             if self.backend_type == "local":
-                full_path = self.base_path / clean_path
-                if full_path.exists():
-                    return full_path.stat().st_size
-                return 0
+                try:
+                    return os.stat(os.path.join(self._base_str, clean_path)).st_size
+                except FileNotFoundError:
+                    return 0
                 
             else:  # S3
-                try:
-                    response = self.s3_client.head_object(Bucket=self.s3_bucket, Key=clean_path)
-                    return response['ContentLength']
-                except ClientError as e:
-                    if e.response['Error']['Code'] == '404':
-                        return 0
-                    raise StorageError(f"S3 size check failed: {e}")
-                    
+                response = self.s3_client.head_object(Bucket=self.s3_bucket, Key=clean_path)
+                return response['ContentLength']
+        except ClientError as e:
+            if e.response['Error']['Code'] == '404':
+                return 0
+            logger.error(f"❌ S3 size check failed: {e}")
+            return 0
         except Exception as e:
             logger.error(f"❌ Storage size check failed: {e}")
             return 0
@@ -274,35 +594,58 @@ class StorageService:
             clean_prefix = self._validate_path(prefix)
             
             if self.backend_type == "local":
-                full_prefix = self.base_path / clean_prefix
-                if not full_prefix.exists():
+                full_prefix = os.path.normpath(os.path.join(self._base_str, clean_prefix))
+                if not os.path.isdir(full_prefix):
                     return []
                 
                 files = []
-                for item in full_prefix.rglob("*"):
-                    if item.is_file():
-                        files.append(str(item.relative_to(self.base_path)))
+                self._scan_local_files(full_prefix, len(os.path.join(self._base_str, '')), files)
                 return files
                 
             else:  # S3
-                try:
-                    response = self.s3_client.list_objects_v2(
-                        Bucket=self.s3_bucket,
-                        Prefix=clean_prefix
-                    )
-                    
-                    if 'Contents' in response:
-                        return [obj['Key'] for obj in response['Contents']]
-                    return []
-                    
-                except ClientError as e:
-                    logger.error(f"❌ S3 list failed: {e}")
-                    raise StorageError(f"S3 list failed: {e}")
-                    
+                # A single list_objects_v2 call stops at 1000 keys; page through all of them
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                pages = paginator.paginate(
+                    Bucket=self.s3_bucket,
+                    Prefix=clean_prefix,
+                    PaginationConfig={'PageSize': 1000}
+                )
+                return [obj['Key'] for page in pages for obj in page.get('Contents', ())]
+                
+        except ClientError as e:
+            logger.error(f"❌ S3 list failed: {e}")
+            return []
         except Exception as e:
             logger.error(f"❌ Storage list failed: {e}")
             return []
 
+    # Async variants run the blocking call in a worker thread, so the event loop stays free
+    # and several storage operations can be awaited together (e.g. with asyncio.gather)
+    
+    async def save_bytes_async(self, path: str, data: bytes) -> str:
+        """Async save_bytes"""
+        return await asyncio.to_thread(self.save_bytes, path, data)
+    
+    async def open_async(self, path: str) -> bytes:
+        """Async open"""
+        return await asyncio.to_thread(self.open, path)
+    
+    async def exists_async(self, path: str) -> bool:
+        """Async exists"""
+        return await asyncio.to_thread(self.exists, path)
+    
+    async def delete_async(self, path: str) -> None:
+        """Async delete"""
+        await asyncio.to_thread(self.delete, path)
+    
+    async def list_files_async(self, prefix: str = "") -> list:
+        """Async list_files"""
+        return await asyncio.to_thread(self.list_files, prefix)
+    
+    async def save_many_async(self, items: List[tuple]) -> List[str]:
+        """Save several (path, data) pairs concurrently; returns their paths/URIs in order"""
+        return list(await asyncio.gather(*(self.save_bytes_async(path, data) for path, data in items)))
+
 # Global storage service instance
 storage_service = StorageService()
 
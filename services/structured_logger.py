@@ -1,26 +1,53 @@
 import os
+import re
 import json
+import queue
+import atexit
 import logging
-import uuid
+import logging.handlers
 import time
+import itertools
 from datetime import datetime
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, Tuple
 from contextlib import contextmanager
-import threading
+from contextvars import ContextVar
+
+try:
+    import orjson  # faster JSON encoding of log entries
+except ImportError:
+    orjson = None
+
+# Emoji and pictographs used as message prefixes (plus variation selectors / joiners)
+_EMOJI_RE = re.compile('[\U0001F300-\U0001FAFF\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\uFE0F\u200D]')
+
+def _json_default(obj):
+    """json.dumps fallback for datetimes (orjson encodes them natively, in the same ISO format)"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 # Configure logging format
 class StructuredFormatter(logging.Formatter):
     """JSON formatter for structured logging"""
     
+    def __init__(self, strip_emoji: bool = False):
+        super().__init__()
+        self.strip_emoji = strip_emoji
+    
     def format(self, record):
-        # Create structured log entry
+        message = record.getMessage()
+        if self.strip_emoji and not message.isascii():
+            message = _EMOJI_RE.sub('', message).strip()
+        
+        # Create structured log entry; the timestamp is when the record was created
+        # (formatting happens later on the queue listener thread)
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(record.created),
             "level": record.levelname,
             "module": record.module,
             "function": record.funcName,
             "line": record.lineno,
-            "message": record.getMessage()
+            "message": message
         }
         
         # Add request correlation if available
@@ -51,7 +78,72 @@ class StructuredFormatter(logging.Formatter):
                 "message": str(record.exc_info[1])
             }
         
-        return json.dumps(log_entry)
+        if orjson is not None:
+            try:
+                return orjson.dumps(log_entry).decode()
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; let json report anything truly unserializable
+        return json.dumps(log_entry, default=_json_default)
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for an in-process queue: merges args into the message but keeps
+    exc_info, so the listener-side StructuredFormatter still sees the exception"""
+    
+    def prepare(self, record):
+        message = record.getMessage()
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        return record
+
+# (request_id, opportunity_id) for log correlation; a ContextVar is per asyncio task
+# as well as per thread, so concurrent requests on one event loop don't share it
+_request_context: ContextVar[Tuple[Optional[str], Optional[str]]] = ContextVar(
+    "reqagent_request_context", default=(None, None)
+)
+
+# Operation ids: low 16 bits of the pid + a per-process counter, unmasked so ids never repeat
+# within a process (at least 4 hex digits, growing as needed; correlation only, not secret)
+_op_counter = itertools.count()
+_pid_hex = f"{os.getpid() & 0xffff:04x}"
+
+def _reset_operation_ids():
+    """Forked children get their own pid prefix and counter"""
+    global _op_counter, _pid_hex
+    _op_counter = itertools.count()
+    _pid_hex = f"{os.getpid() & 0xffff:04x}"
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_operation_ids)
+
+# Listener thread writing queued records to the real handlers (one per process)
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_queue_listener():
+    """Flush queued records and stop the listener thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
+
+def _write_directly_in_child():
+    """Forked children inherit the QueueHandler but not the listener thread, and
+    multiprocessing workers exit without running atexit: log synchronously there"""
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    logger = logging.getLogger('reqagent')
+    for handler in logger.handlers[:]:
+        if isinstance(handler, _InProcessQueueHandler):
+            logger.removeHandler(handler)
+    for handler in _queue_listener.handlers:
+        logger.addHandler(handler)
+    _queue_listener = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_write_directly_in_child)
 
 class StructuredLogger:
     """Structured logging service for ReqAgent"""
@@ -65,113 +157,120 @@ class StructuredLogger:
         # Set up formatter
         formatter = StructuredFormatter()
         
+        # LOG_STRIP_EMOJI: "auto" strips emoji for files and non-TTY consoles, "1" always, "0" never
+        self.strip_emoji = os.getenv('LOG_STRIP_EMOJI', 'auto').lower()
+        
         # Configure handlers
         self._setup_handlers(formatter)
         
         # Set log level from environment
         log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
         self.logger.setLevel(getattr(logging, log_level, logging.INFO))
-        
-        # Thread-local storage for request context
-        self._local = threading.local()
     
     def _setup_handlers(self, formatter):
-        """Set up logging handlers"""
-        # Remove existing handlers
+        """Set up logging handlers
+        
+        Callers only enqueue records; a background QueueListener does the JSON
+        formatting and console/file writes.
+        """
+        global _queue_listener
+        
+        # Remove existing handlers (and stop the listener feeding them)
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
+        _stop_queue_listener()
+        
+        # Emoji cost multibyte encoding (or UnicodeEncodeError on non-UTF-8 streams) where
+        # nobody looks at them: files and piped/containerised consoles
+        stripping_formatter = StructuredFormatter(strip_emoji=True)
+        if self.strip_emoji in ('1', 'true'):
+            formatter = stripping_formatter
         
         # Console handler (for development)
         console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        is_tty = getattr(console_handler.stream, 'isatty', lambda: False)()
+        console_handler.setFormatter(stripping_formatter if self.strip_emoji == 'auto' and not is_tty else formatter)
+        handlers = [console_handler]
         
         # File handler (optional)
         log_file = os.getenv('LOG_FILE')
         if log_file:
             try:
                 file_handler = logging.FileHandler(log_file)
-                file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
+                file_handler.setFormatter(stripping_formatter if self.strip_emoji == 'auto' else formatter)
+                handlers.append(file_handler)
             except Exception as e:
                 print(f"Warning: Could not set up file logging: {e}")
         
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(_InProcessQueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _queue_listener.start()
+        
         # Disable propagation to root logger
         self.logger.propagate = False
     
     def set_request_context(self, request_id: str, opportunity_id: Optional[str] = None):
         """Set request context for correlation"""
-        self._local.request_id = request_id
-        self._local.opportunity_id = opportunity_id
+        _request_context.set((request_id, opportunity_id))
     
     def clear_request_context(self):
         """Clear request context"""
-        self._local.request_id = None
-        self._local.opportunity_id = None
+        _request_context.set((None, None))
     
     def _get_request_context(self) -> Dict[str, Any]:
         """Get current request context"""
+        request_id, opportunity_id = _request_context.get()
         context = {}
         
-        if hasattr(self._local, 'request_id') and self._local.request_id:
-            context['request_id'] = self._local.request_id
+        if request_id:
+            context['request_id'] = request_id
         
-        if hasattr(self._local, 'opportunity_id') and self._local.opportunity_id:
-            context['opportunity_id'] = self._local.opportunity_id
+        if opportunity_id:
+            context['opportunity_id'] = opportunity_id
         
         return context
     
-    def _log_with_context(self, level: str, message: str, **kwargs):
+    def _log_with_context(self, level: int, message: str, **kwargs):
         """Log message with request context"""
-        # Create log record with extra fields
+        # Skip building the record entirely when the level is filtered out
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        # Extra fields carry the context (StructuredFormatter adds the timestamp)
         extra_fields = self._get_request_context()
         extra_fields.update(kwargs)
         
-        # Add timestamp
-        extra_fields['timestamp'] = datetime.utcnow().isoformat()
-        
-        # Create custom log record
-        record = logging.LogRecord(
-            name=self.logger.name,
-            level=getattr(logging, level.upper()),
-            pathname='',
-            lineno=0,
-            msg=message,
-            args=(),
-            exc_info=None
-        )
-        
-        # Add extra fields
-        record.extra_fields = extra_fields
-        
-        # Log the record
-        self.logger.handle(record)
+        # stacklevel=3 skips this method and info()/warning()/... so the record
+        # carries the caller's module, function and line
+        self.logger.log(level, message, extra={'extra_fields': extra_fields}, stacklevel=3)
     
     def info(self, message: str, **kwargs):
         """Log info message with context"""
-        self._log_with_context('INFO', message, **kwargs)
+        self._log_with_context(logging.INFO, message, **kwargs)
     
     def warning(self, message: str, **kwargs):
         """Log warning message with context"""
-        self._log_with_context('WARNING', message, **kwargs)
+        self._log_with_context(logging.WARNING, message, **kwargs)
     
     def error(self, message: str, **kwargs):
         """Log error message with context"""
-        self._log_with_context('ERROR', message, **kwargs)
+        self._log_with_context(logging.ERROR, message, **kwargs)
     
     def debug(self, message: str, **kwargs):
         """Log debug message with context"""
-        self._log_with_context('DEBUG', message, **kwargs)
+        self._log_with_context(logging.DEBUG, message, **kwargs)
     
     def critical(self, message: str, **kwargs):
         """Log critical message with context"""
-        self._log_with_context('CRITICAL', message, **kwargs)
+        self._log_with_context(logging.CRITICAL, message, **kwargs)
     
     @contextmanager
     def timed_operation(self, action: str, **kwargs):
         """Context manager for timing operations"""
-        start_time = time.time()
-        operation_id = str(uuid.uuid4())[:8]
+        # Monotonic clock: durations are unaffected by wall-clock adjustments
+        start_ns = time.perf_counter_ns()
+        operation_id = f"{_pid_hex}{next(_op_counter):04x}"
         
         try:
             # Log operation start
@@ -184,7 +283,7 @@ class StructuredLogger:
             yield operation_id
             
             # Log operation success
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             self.info(f"✅ Operation completed: {action}", 
                      action=action, 
                      operation_id=operation_id,
@@ -194,7 +293,7 @@ class StructuredLogger:
             
         except Exception as e:
             # Log operation failure
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
             self.error(f"❌ Operation failed: {action}", 
                       action=action, 
                       operation_id=operation_id,
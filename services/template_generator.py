@@ -1,55 +1,277 @@
+import io
 import os
+import re
 import json
+import functools
 import hashlib
+import importlib.util
 import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.enum.style import WD_STYLE_TYPE
-from docx.oxml.shared import OxmlElement, qn
-from docx.oxml.ns import nsdecls
-from docx.oxml import parse_xml
-import tempfile
+from typing import Dict, Any, List, Optional, Tuple, Iterator, BinaryIO
+from dataclasses import dataclass, field
+from io import BytesIO
+
+try:
+    import orjson  # faster canonical JSON for content hashes
+except ImportError:
+    orjson = None
 
 # Import storage service
 from services.storage import storage_service, StorageError
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# hashlib.sha256 is OpenSSL's implementation (SHA-NI/AVX2 accelerated) unless Python was built
+# without _hashlib, in which case it silently falls back to the scalar builtin
+if getattr(hashlib.sha256, '__name__', '') != 'openssl_sha256':
+    logger.warning("⚠️ hashlib is not OpenSSL-backed; template content hashing uses the builtin SHA-256")
+
+@dataclass(slots=True, frozen=True)
 class ContentSection:
     """Represents a section in the proposal template"""
     heading: str
     instruction: str
     placeholder: str
 
-@dataclass
+@dataclass(slots=True)
 class ContentModel:
     """Deterministic content model for proposal templates"""
     cover: Dict[str, str]
     sections: List[ContentSection]
     funder_notes: Optional[str]
     metadata: Dict[str, Any]
+    # Memoized compute_hash() result; a built content model is not mutated afterwards
+    _hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for hashing"""
+        # Sections are flat string fields, so build their dicts directly (asdict deep-copies)
         return {
             'cover': self.cover,
-            'sections': [asdict(section) for section in self.sections],
+            'sections': [
+                {'heading': s.heading, 'instruction': s.instruction, 'placeholder': s.placeholder}
+                for s in self.sections
+            ],
             'funder_notes': self.funder_notes,
             'metadata': self.metadata
         }
     
     def compute_hash(self) -> str:
         """Compute stable SHA256 hash from sorted content"""
-        # Convert to sorted JSON for deterministic hashing
+        if self._hash is None:
+            # Convert to sorted JSON for deterministic hashing
+            self._hash = hashlib.sha256(self._canonical_json()).hexdigest()
+        return self._hash
+    
+    def _canonical_json(self) -> bytes:
+        """Sorted, compact JSON bytes, identical to json.dumps(sort_keys=True, separators=(',', ':'))
+        (stored template hashes depend on it)"""
         content_dict = self.to_dict()
+        if orjson is not None and _flat_json_scalars(self.cover) and _flat_json_scalars(self.metadata):
+            try:
+                content_bytes = orjson.dumps(content_dict, option=orjson.OPT_SORT_KEYS)
+            except TypeError:
+                content_bytes = None
+            # json.dumps escapes non-ASCII and DEL; orjson doesn't, so only its pure-ASCII output matches
+            if content_bytes is not None and content_bytes.isascii() and b'\x7f' not in content_bytes:
+                return content_bytes
         content_json = json.dumps(content_dict, sort_keys=True, separators=(',', ':'))
+        return content_json.encode('utf-8')
+    
+    def render_key(self) -> str:
+        """Hash of the content that drives rendering, ignoring metadata.generated_at
+        (compute_hash includes the timestamp, so it never repeats between builds)"""
+        content_dict = self.to_dict()
+        content_dict['metadata'] = {k: v for k, v in self.metadata.items() if k != 'generated_at'}
+        content_json = json.dumps(content_dict, sort_keys=True, separators=(',', ':'), default=str)
         return hashlib.sha256(content_json.encode('utf-8')).hexdigest()
 
+def _flat_json_scalars(values: Dict[str, Any]) -> bool:
+    """True if every value is a str/int/bool/None (floats format differently in orjson)"""
+    return all(value is None or type(value) in (str, int, bool) for value in values.values())
+
+# (epoch second, local ISO string for that second) reused by _now_isoformat within the same second
+_iso_second_cache: Tuple[Optional[int], str] = (None, '')
+
+def _now_isoformat() -> str:
+    """Same string as datetime.now().isoformat(), formatting the date/time part once per second"""
+    global _iso_second_cache
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached = _iso_second_cache
+    if cached[0] != seconds:
+        cached = _iso_second_cache = (seconds, datetime.fromtimestamp(seconds).isoformat())
+    micros = nanos // 1000
+    return f"{cached[1]}.{micros:06d}" if micros else cached[1]
+
+# Stylesheet for WeasyPrint PDFs; parsed once per generator rather than inline per document
+_PDF_CSS = """
+body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
+h1 { color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }
+h2 { color: #34495e; margin-top: 30px; }
+.cover-table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+.cover-table td { padding: 8px; border: 1px solid #ddd; }
+.cover-table td:first-child { font-weight: bold; background: #f8f9fa; }
+.section { margin: 20px 0; }
+.instruction { background: #f8f9fa; padding: 10px; border-left: 4px solid #3498db; }
+.placeholder { background: #fff3cd; padding: 10px; border: 1px solid #ffeaa7; }
+.footer { margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 0.9em; color: #666; }
+"""
+
+# HTML layout for WeasyPrint PDFs (rendered with Jinja2)
+_HTML_TEMPLATE_RAW = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+</head>
+<body>
+    <h1>Proposal Template: {{ cover.title }}</h1>
+    
+    <h2>Opportunity Information</h2>
+    <table class="cover-table">
+        <tr><td>Donor/Funder</td><td>{{ cover.donor }}</td></tr>
+        <tr><td>Deadline</td><td>{{ cover.deadline }}</td></tr>
+        <tr><td>Funding Amount</td><td>{{ cover.amount }}</td></tr>
+        <tr><td>Location/Eligibility</td><td>{{ cover.location }}</td></tr>
+        <tr><td>Themes/Focus Areas</td><td>{{ cover.themes }}</td></tr>
+        <tr><td>Opportunity URL</td><td>{{ cover.opportunity_url }}</td></tr>
+        <tr><td>Organization</td><td>{{ cover.org_name }}</td></tr>
+        <tr><td>Country</td><td>{{ cover.country }}</td></tr>
+        <tr><td>Contact Person</td><td>{{ cover.contact_name }}</td></tr>
+    </table>
+    
+    {% if funder_notes %}
+    <h2>Funder Requirements & Notes</h2>
+    <div class="instruction">{{ funder_notes }}</div>
+    {% endif %}
+    
+    <h2>Instructions</h2>
+    <p>This template provides the structure for your proposal. Replace the instructional text below with your actual content. Each section includes guidance on what to include.</p>
+    
+    <h2>Proposal Sections</h2>
+    {% for section in sections %}
+    <div class="section">
+        <h3>{{ loop.index }}. {{ section.heading }}</h3>
+        <div class="instruction"><strong>[INSTRUCTION]</strong> {{ section.instruction }}</div>
+        <div class="placeholder">{{ section.placeholder }}</div>
+    </div>
+    {% endfor %}
+    
+    <div class="footer">
+        <p><strong>Generated:</strong> {{ metadata.generated_at }}</p>
+        <p><strong>By:</strong> NGOInfo ReqAgent</p>
+        <p><strong>Version:</strong> {{ metadata.version }}</p>
+    </div>
+</body>
+</html>
+"""
+
+# Minified once at import: whitespace between tags and around {% %} blocks is insignificant here,
+# and WeasyPrint's parser would otherwise tokenize it on every render
+_HTML_TEMPLATE_SRC = re.sub(r'(>|%\})\s+(<|\{%)', r'\1\2', _HTML_TEMPLATE_RAW).strip()
+
+@functools.lru_cache(maxsize=1)
+def _html_template():
+    """Compile the PDF HTML template once; autoescape keeps user text from breaking the markup"""
+    import jinja2
+    
+    # Autoescaping runs markupsafe.escape on every field; without its C extension that is a Python loop
+    if importlib.util.find_spec("markupsafe._speedups") is None:
+        logger.warning("⚠️ markupsafe C speedups not available; HTML escaping falls back to pure Python")
+    
+    return jinja2.Environment(autoescape=True).from_string(_HTML_TEMPLATE_SRC)
+
+# Instructions paragraph shared by the ReportLab layout
+_PDF_INSTRUCTIONS_TEXT = "This template provides the structure for your proposal. Replace the instructional text below with your actual content. Each section includes guidance on what to include."
+
+@functools.lru_cache(maxsize=1)
+def _reportlab_layout() -> Dict[str, Any]:
+    """Build the ReportLab stylesheet, custom paragraph styles, cover table style and the
+    parsed fixed-text paragraphs once"""
+    from reportlab.platypus import Paragraph, TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    
+    styles = getSampleStyleSheet()
+    
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=30,
+        alignment=1  # Center
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12
+    )
+    
+    cover_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    # Fixed headings/text parsed once; per document they are cloned from these fragments, since
+    # layout stores state on each Paragraph and documents render concurrently
+    fixed_paragraphs = {
+        text: Paragraph(text, style)
+        for text, style in (
+            ("Opportunity Information", heading_style),
+            ("Funder Requirements & Notes", heading_style),
+            ("Instructions", heading_style),
+            (_PDF_INSTRUCTIONS_TEXT, styles['Normal']),
+            ("Proposal Sections", heading_style),
+            ("Template Information", heading_style),
+            ("By: NGOInfo ReqAgent", styles['Normal']),
+        )
+    }
+    
+    return {
+        'styles': styles,
+        'title_style': title_style,
+        'heading_style': heading_style,
+        'cover_table_style': cover_table_style,
+        'cover_col_widths': [2*inch, 4*inch],
+        'fixed_paragraphs': fixed_paragraphs,
+    }
+
+class _PDFChunkSink(io.RawIOBase):
+    """Write-only file object that keeps the chunks a PDF engine writes instead of copying them into one buffer"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = deque()
+        self.size = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        chunk = data if type(data) is bytes else bytes(data)
+        self._chunks.append(chunk)
+        self.size += len(chunk)
+        return len(chunk)
+    
+    def drain(self) -> Iterator[bytes]:
+        """Yield the written chunks, dropping each one once it has been handed out"""
+        while self._chunks:
+            yield self._chunks.popleft()
+
 class TemplateBuildError(Exception):
     """Exception for template generation failures"""
     pass
@@ -63,34 +285,92 @@ class ProposalTemplateGenerator:
     
     def __init__(self):
         self.pdf_engine = os.getenv("PDF_ENGINE", "reportlab").lower()
+        self._weasyprint_html = None
+        self._font_config = None
+        self._css = None
+        self.render_workers = int(os.getenv("TEMPLATE_RENDER_WORKERS", "4"))
+        self._pool = None
+        # Recent (content model, DOCX, PDF) outputs by render key, oldest first
+        self.output_cache_size = int(os.getenv("TEMPLATE_CACHE_SIZE", "64"))
+        self.output_cache_ttl = int(os.getenv("TEMPLATE_CACHE_TTL", "3600"))
+        self._output_cache: "OrderedDict[str, Tuple[float, ContentModel, bytes, Optional[bytes]]]" = OrderedDict()
+        self._output_cache_lock = threading.Lock()
         self._check_pdf_capabilities()
     
     def _check_pdf_capabilities(self):
         """Check available PDF generation capabilities"""
+        # Probe with find_spec; the engines themselves are imported on first render
         if self.pdf_engine == "weasyprint":
-            try:
-                import weasyprint
+            if importlib.util.find_spec("weasyprint") is not None:
                 logger.info("✅ WeasyPrint PDF engine available")
-            except ImportError:
+            else:
                 logger.warning("⚠️ WeasyPrint not available, falling back to ReportLab")
                 self.pdf_engine = "reportlab"
         
         if self.pdf_engine == "reportlab":
-            try:
-                import reportlab
+            if importlib.util.find_spec("reportlab") is not None:
                 logger.info("✅ ReportLab PDF engine available")
-            except ImportError:
+            else:
                 logger.error("❌ No PDF engine available - PDF generation disabled")
                 self.pdf_engine = None
     
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Lazily create the thread pool that renders PDFs alongside DOCX generation"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.render_workers, thread_name_prefix="template-pdf")
+        return self._pool
+    
+    def _output_cache_get(self, key: str) -> Optional[Tuple[ContentModel, bytes, Optional[bytes]]]:
+        """Return a cached template output if present and not expired"""
+        with self._output_cache_lock:
+            entry = self._output_cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.output_cache_ttl:
+                del self._output_cache[key]
+                return None
+            self._output_cache.move_to_end(key)
+            return entry[1:]
+    
+    def _output_cache_put(self, key: str, content_model: ContentModel, docx_bytes: bytes, pdf_bytes: Optional[bytes]):
+        """Remember a template output, evicting the least recently used entry when full"""
+        if self.output_cache_size <= 0:
+            return
+        with self._output_cache_lock:
+            self._output_cache[key] = (time.monotonic(), content_model, docx_bytes, pdf_bytes)
+            self._output_cache.move_to_end(key)
+            while len(self._output_cache) > self.output_cache_size:
+                self._output_cache.popitem(last=False)
+    
+    def _get_weasyprint(self):
+        """Import WeasyPrint and create the shared FontConfiguration and parsed stylesheet once;
+        reusing them keeps imports, font enumeration and CSS parsing out of each PDF render"""
+        if self._css is None:
+            try:
+                from weasyprint import HTML, CSS
+                try:
+                    from weasyprint.text.fonts import FontConfiguration
+                except ImportError:  # WeasyPrint < 53
+                    from weasyprint.fonts import FontConfiguration
+            except ImportError:
+                logger.error("❌ WeasyPrint not available")
+                raise PDFGenerationError("WeasyPrint not available")
+            
+            self._font_config = FontConfiguration()
+            self._css = CSS(string=_PDF_CSS, font_config=self._font_config)
+            self._weasyprint_html = HTML
+        return self._weasyprint_html, self._font_config, self._css
+    
     def build_content_model(
         self, 
         opportunity_data: Dict[str, Any], 
         sections: List[Dict[str, str]], 
         funder_notes: Optional[str] = None,
-        hints: Optional[Dict[str, str]] = None
+        hints: Optional[Dict[str, str]] = None,
+        generated_at: Optional[str] = None
     ) -> ContentModel:
-        """Build deterministic content model from opportunity data and sections"""
+        """Build deterministic content model from opportunity data and sections.
+        Pass generated_at to pin the timestamp (and so the content hash)"""
         try:
             # Extract opportunity information
             title = opportunity_data.get('title', 'Funding Opportunity')
@@ -142,7 +422,7 @@ class ProposalTemplateGenerator:
             
             # Build metadata
             metadata = {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': generated_at if generated_at is not None else _now_isoformat(),
                 'opportunity_id': opportunity_data.get('id'),
                 'source_url': opportunity_data.get('source_url'),
                 'version': '2.0.0'
@@ -162,6 +442,14 @@ class ProposalTemplateGenerator:
     def generate_docx(self, content_model: ContentModel) -> bytes:
         """Generate DOCX document from content model"""
         try:
+            # python-docx pulls in lxml and its oxml class registry; load it on first use, not at boot
+            from docx import Document
+            from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+            from docx.shared import Pt
+            
+            # Vertical gaps are paragraph spacing, not empty <w:p> spacer paragraphs
+            gap = Pt(12)
+            
             doc = Document()
             
             # Add title page
@@ -170,9 +458,6 @@ class ProposalTemplateGenerator:
             
             # Add cover information table
             doc.add_heading('Opportunity Information', level=1)
-            table = doc.add_table(rows=0, cols=2)
-            table.style = 'Table Grid'
-            
             cover_fields = [
                 ('Donor/Funder', content_model.cover['donor']),
                 ('Deadline', content_model.cover['deadline']),
@@ -185,27 +470,31 @@ class ProposalTemplateGenerator:
                 ('Contact Person', content_model.cover['contact_name'])
             ]
             
-            for label, value in cover_fields:
-                row_cells = table.add_row().cells
+            # Create every row up front; add_row() per field re-walks the table XML each time
+            table = doc.add_table(rows=len(cover_fields), cols=2)
+            table.style = 'Table Grid'
+            
+            for (label, value), row in zip(cover_fields, table.rows):
+                row_cells = row.cells
                 row_cells[0].text = label
                 row_cells[0].paragraphs[0].runs[0].bold = True
                 row_cells[1].text = str(value)
             
             # Add funder notes if provided
+            # (Heading styles carry their own space before, so the heading needs no gap)
             if content_model.funder_notes:
-                doc.add_paragraph('')
                 doc.add_heading('Funder Requirements & Notes', level=1)
                 funder_para = doc.add_paragraph(content_model.funder_notes.strip())
                 funder_para.style = 'Intense Quote'
             
             # Add instructions
-            doc.add_paragraph('')
             instruction_para = doc.add_paragraph()
+            instruction_para.paragraph_format.space_before = gap
+            instruction_para.paragraph_format.space_after = gap
             instruction_para.add_run('Instructions: ').bold = True
             instruction_para.add_run('This template provides the structure for your proposal. Replace the instructional text below with your actual content. Each section includes guidance on what to include.')
             
             # Add proposal sections
-            doc.add_paragraph('')
             doc.add_heading('Proposal Sections', level=1)
             
             for i, section in enumerate(content_model.sections, 1):
@@ -222,8 +511,7 @@ class ProposalTemplateGenerator:
                 content_para = doc.add_paragraph()
                 content_para.add_run(section.placeholder)
                 content_para.style = 'Quote'
-                
-                doc.add_paragraph('')
+                content_para.paragraph_format.space_after = gap
             
             # Add footer
             doc.add_page_break()
@@ -236,12 +524,10 @@ class ProposalTemplateGenerator:
             footer_para.add_run('\nVersion: ').bold = True
             footer_para.add_run(content_model.metadata['version'])
             
-            # Save to bytes
-            with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as tmp_file:
-                doc.save(tmp_file.name)
-                with open(tmp_file.name, 'rb') as f:
-                    docx_bytes = f.read()
-                os.unlink(tmp_file.name)
+            # Save to bytes (in memory; no temp file round-trip)
+            buffer = BytesIO()
+            doc.save(buffer)
+            docx_bytes = buffer.getvalue()
             
             logger.info(f"✅ Generated DOCX: {len(docx_bytes)} bytes")
             return docx_bytes
@@ -252,15 +538,24 @@ class ProposalTemplateGenerator:
     
     def generate_pdf(self, content_model: ContentModel) -> Optional[bytes]:
         """Generate PDF from content model using available engine"""
+        chunks = self.generate_pdf_stream(content_model)
+        if chunks is None:
+            return None
+        return b"".join(chunks)
+    
+    def generate_pdf_stream(self, content_model: ContentModel) -> Optional[Iterator[bytes]]:
+        """Generate PDF and return its bytes as an iterator of chunks, in the order the engine wrote them.
+        Chunks are released as they are consumed, so piping them to storage avoids an extra full copy"""
         if not self.pdf_engine:
             logger.warning("⚠️ PDF generation disabled - no engine available")
             return None
         
+        sink = _PDFChunkSink()
         try:
             if self.pdf_engine == "weasyprint":
-                return self._generate_pdf_weasyprint(content_model)
+                self._generate_pdf_weasyprint(content_model, sink)
             elif self.pdf_engine == "reportlab":
-                return self._generate_pdf_reportlab(content_model)
+                self._generate_pdf_reportlab(content_model, sink)
             else:
                 logger.error(f"❌ Unknown PDF engine: {self.pdf_engine}")
                 return None
@@ -268,223 +563,158 @@ class ProposalTemplateGenerator:
         except Exception as e:
             logger.error(f"❌ PDF generation failed: {e}")
             raise PDFGenerationError(f"PDF generation failed: {e}")
+        
+        return sink.drain()
     
-    def _generate_pdf_weasyprint(self, content_model: ContentModel) -> bytes:
-        """Generate PDF using WeasyPrint"""
-        try:
-            from weasyprint import HTML, CSS
-            from jinja2 import Template
-            
-            # HTML template
-            html_template = """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body { font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }
-                    h1 { color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }
-                    h2 { color: #34495e; margin-top: 30px; }
-                    .cover-table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-                    .cover-table td { padding: 8px; border: 1px solid #ddd; }
-                    .cover-table td:first-child { font-weight: bold; background: #f8f9fa; }
-                    .section { margin: 20px 0; }
-                    .instruction { background: #f8f9fa; padding: 10px; border-left: 4px solid #3498db; }
-                    .placeholder { background: #fff3cd; padding: 10px; border: 1px solid #ffeaa7; }
-                    .footer { margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd; font-size: 0.9em; color: #666; }
-                </style>
-            </head>
-            <body>
-                <h1>Proposal Template: {{ cover.title }}</h1>
-                
-                <h2>Opportunity Information</h2>
-                <table class="cover-table">
-                    <tr><td>Donor/Funder</td><td>{{ cover.donor }}</td></tr>
-                    <tr><td>Deadline</td><td>{{ cover.deadline }}</td></tr>
-                    <tr><td>Funding Amount</td><td>{{ cover.amount }}</td></tr>
-                    <tr><td>Location/Eligibility</td><td>{{ cover.location }}</td></tr>
-                    <tr><td>Themes/Focus Areas</td><td>{{ cover.themes }}</td></tr>
-                    <tr><td>Opportunity URL</td><td>{{ cover.opportunity_url }}</td></tr>
-                    <tr><td>Organization</td><td>{{ cover.org_name }}</td></tr>
-                    <tr><td>Country</td><td>{{ cover.country }}</td></tr>
-                    <tr><td>Contact Person</td><td>{{ cover.contact_name }}</td></tr>
-                </table>
-                
-                {% if funder_notes %}
-                <h2>Funder Requirements & Notes</h2>
-                <div class="instruction">{{ funder_notes }}</div>
-                {% endif %}
-                
-                <h2>Instructions</h2>
-                <p>This template provides the structure for your proposal. Replace the instructional text below with your actual content. Each section includes guidance on what to include.</p>
-                
-                <h2>Proposal Sections</h2>
-                {% for section in sections %}
-                <div class="section">
-                    <h3>{{ loop.index }}. {{ section.heading }}</h3>
-                    <div class="instruction"><strong>[INSTRUCTION]</strong> {{ section.instruction }}</div>
-                    <div class="placeholder">{{ section.placeholder }}</div>
-                </div>
-                {% endfor %}
-                
-                <div class="footer">
-                    <p><strong>Generated:</strong> {{ metadata.generated_at }}</p>
-                    <p><strong>By:</strong> NGOInfo ReqAgent</p>
-                    <p><strong>Version:</strong> {{ metadata.version }}</p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            # Render HTML
-            template = Template(html_template)
-            html_content = template.render(
-                cover=content_model.cover,
-                sections=content_model.sections,
-                funder_notes=content_model.funder_notes,
-                metadata=content_model.metadata
-            )
-            
-            # Generate PDF
-            html = HTML(string=html_content)
-            pdf_bytes = html.write_pdf()
-            
-            logger.info(f"✅ Generated PDF with WeasyPrint: {len(pdf_bytes)} bytes")
-            return pdf_bytes
-            
-        except ImportError:
-            logger.error("❌ WeasyPrint not available")
-            raise PDFGenerationError("WeasyPrint not available")
+    def _generate_pdf_weasyprint(self, content_model: ContentModel, target: BinaryIO) -> int:
+        """Generate PDF using WeasyPrint, writing it to target; returns the PDF size"""
+        HTML, font_config, css = self._get_weasyprint()
+        
+        # Render HTML
+        html_content = _html_template().render(
+            cover=content_model.cover,
+            sections=content_model.sections,
+            funder_notes=content_model.funder_notes,
+            metadata=content_model.metadata
+        )
+        
+        # Generate PDF
+        html = HTML(string=html_content)
+        html.write_pdf(target=target, stylesheets=[css], font_config=font_config)
+        
+        logger.info(f"✅ Generated PDF with WeasyPrint: {target.size} bytes")
+        return target.size
     
-    def _generate_pdf_reportlab(self, content_model: ContentModel) -> bytes:
-        """Generate PDF using ReportLab (pure Python fallback)"""
-        try:
-            from reportlab.lib.pagesizes import letter, A4
-            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-            from reportlab.lib.units import inch
-            from reportlab.lib import colors
-            from io import BytesIO
-            
-            # Create PDF buffer
-            buffer = BytesIO()
-            doc = SimpleDocTemplate(buffer, pagesize=A4)
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=18,
-                spaceAfter=30,
-                alignment=1  # Center
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=14,
-                spaceAfter=12
-            )
-            
-            # Build story
-            story = []
-            
-            # Title
-            story.append(Paragraph(f"Proposal Template: {content_model.cover['title']}", title_style))
-            story.append(Spacer(1, 20))
-            
-            # Cover information table
-            story.append(Paragraph("Opportunity Information", heading_style))
-            
-            cover_data = [
-                ['Donor/Funder', content_model.cover['donor']],
-                ['Deadline', content_model.cover['deadline']],
-                ['Funding Amount', content_model.cover['amount']],
-                ['Location/Eligibility', content_model.cover['location']],
-                ['Themes/Focus Areas', content_model.cover['themes']],
-                ['Opportunity URL', content_model.cover['opportunity_url']],
-                ['Organization', content_model.cover['org_name']],
-                ['Country', content_model.cover['country']],
-                ['Contact Person', content_model.cover['contact_name']]
-            ]
-            
-            cover_table = Table(cover_data, colWidths=[2*inch, 4*inch])
-            cover_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-                ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(cover_table)
-            story.append(Spacer(1, 20))
-            
-            # Funder notes
-            if content_model.funder_notes:
-                story.append(Paragraph("Funder Requirements & Notes", heading_style))
-                story.append(Paragraph(content_model.funder_notes, styles['Normal']))
-                story.append(Spacer(1, 20))
-            
-            # Instructions
-            story.append(Paragraph("Instructions", heading_style))
-            story.append(Paragraph("This template provides the structure for your proposal. Replace the instructional text below with your actual content. Each section includes guidance on what to include.", styles['Normal']))
+    def _generate_pdf_reportlab(self, content_model: ContentModel, target: BinaryIO) -> int:
+        """Generate PDF using ReportLab (pure Python fallback), writing it to target; returns the PDF size"""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+        
+        # Static layout (styles, table style) is built once; only content flowables are per call
+        layout = _reportlab_layout()
+        styles = layout['styles']
+        title_style = layout['title_style']
+        heading_style = layout['heading_style']
+        fixed_paragraphs = layout['fixed_paragraphs']
+        
+        def fixed(text: str) -> Paragraph:
+            """Fresh Paragraph for fixed text, reusing its pre-parsed fragments"""
+            proto = fixed_paragraphs[text]
+            return Paragraph(proto.text, proto.style, frags=proto.frags)
+        
+        doc = SimpleDocTemplate(target, pagesize=A4)
+        
+        # Build story
+        story = []
+        
+        # Title
+        story.append(Paragraph(f"Proposal Template: {content_model.cover['title']}", title_style))
+        story.append(Spacer(1, 20))
+        
+        # Cover information table
+        story.append(fixed("Opportunity Information"))
+        
+        cover_data = [
+            ['Donor/Funder', content_model.cover['donor']],
+            ['Deadline', content_model.cover['deadline']],
+            ['Funding Amount', content_model.cover['amount']],
+            ['Location/Eligibility', content_model.cover['location']],
+            ['Themes/Focus Areas', content_model.cover['themes']],
+            ['Opportunity URL', content_model.cover['opportunity_url']],
+            ['Organization', content_model.cover['org_name']],
+            ['Country', content_model.cover['country']],
+            ['Contact Person', content_model.cover['contact_name']]
+        ]
+        
+        cover_table = Table(cover_data, colWidths=layout['cover_col_widths'])
+        cover_table.setStyle(layout['cover_table_style'])
+        
+        story.append(cover_table)
+        story.append(Spacer(1, 20))
+        
+        # Funder notes
+        if content_model.funder_notes:
+            story.append(fixed("Funder Requirements & Notes"))
+            story.append(Paragraph(content_model.funder_notes, styles['Normal']))
             story.append(Spacer(1, 20))
-            
-            # Sections
-            story.append(Paragraph("Proposal Sections", heading_style))
-            
-            for i, section in enumerate(content_model.sections, 1):
-                story.append(Paragraph(f"{i}. {section.heading}", heading_style))
-                story.append(Paragraph(f"[INSTRUCTION] {section.instruction}", styles['Normal']))
-                story.append(Paragraph(section.placeholder, styles['Normal']))
-                story.append(Spacer(1, 12))
-            
-            # Footer
-            story.append(Spacer(1, 30))
-            story.append(Paragraph("Template Information", heading_style))
-            story.append(Paragraph(f"Generated: {content_model.metadata['generated_at']}", styles['Normal']))
-            story.append(Paragraph("By: NGOInfo ReqAgent", styles['Normal']))
-            story.append(Paragraph(f"Version: {content_model.metadata['version']}", styles['Normal']))
-            
-            # Build PDF
-            doc.build(story)
-            pdf_bytes = buffer.getvalue()
-            buffer.close()
-            
-            logger.info(f"✅ Generated PDF with ReportLab: {len(pdf_bytes)} bytes")
-            return pdf_bytes
-            
-        except ImportError:
-            logger.error("❌ ReportLab not available")
-            raise PDFGenerationError("ReportLab not available")
+        
+        # Instructions
+        story.append(fixed("Instructions"))
+        story.append(fixed(_PDF_INSTRUCTIONS_TEXT))
+        story.append(Spacer(1, 20))
+        
+        # Sections
+        story.append(fixed("Proposal Sections"))
+        
+        # One extend per section with the style looked up once, rather than four appends and
+        # two stylesheet lookups per section
+        normal_style = styles['Normal']
+        extend = story.extend
+        for i, section in enumerate(content_model.sections, 1):
+            extend((
+                Paragraph(f"{i}. {section.heading}", heading_style),
+                Paragraph(f"[INSTRUCTION] {section.instruction}", normal_style),
+                Paragraph(section.placeholder, normal_style),
+                Spacer(1, 12),
+            ))
+        
+        # Footer
+        story.append(Spacer(1, 30))
+        story.append(fixed("Template Information"))
+        story.append(Paragraph(f"Generated: {content_model.metadata['generated_at']}", styles['Normal']))
+        story.append(fixed("By: NGOInfo ReqAgent"))
+        story.append(Paragraph(f"Version: {content_model.metadata['version']}", styles['Normal']))
+        
+        # Build PDF
+        doc.build(story)
+        
+        logger.info(f"✅ Generated PDF with ReportLab: {target.size} bytes")
+        return target.size
     
     def generate_template(
         self, 
         opportunity_data: Dict[str, Any], 
         sections: List[Dict[str, str]], 
         funder_notes: Optional[str] = None,
-        hints: Optional[Dict[str, str]] = None
+        hints: Optional[Dict[str, str]] = None,
+        use_cache: bool = True
     ) -> Tuple[ContentModel, bytes, Optional[bytes]]:
-        """Generate complete template with content model, DOCX, and PDF"""
+        """Generate complete template with content model, DOCX, and PDF.
+        use_cache=False always renders fresh (the result still refreshes the cache)"""
         try:
             # Build content model
             content_model = self.build_content_model(opportunity_data, sections, funder_notes, hints)
             
+            # Identical content renders identical documents; reuse a recent output
+            render_key = content_model.render_key()
+            cached = self._output_cache_get(render_key) if use_cache else None
+            if cached is not None:
+                logger.info(f"♻️ Reusing cached template output {render_key[:12]}")
+                return cached
+            
+            # Render the PDF on a worker thread while the DOCX is built here. ReportLab is pure
+            # Python and holds the GIL, so this is not parallel CPU work: it keeps PDF rendering
+            # off the calling thread, and only WeasyPrint's native cairo/pango calls truly overlap
+            pdf_future = self._get_pool().submit(self.generate_pdf, content_model)
+            
             # Generate DOCX
-            docx_bytes = self.generate_docx(content_model)
+            try:
+                docx_bytes = self.generate_docx(content_model)
+            except Exception:
+                pdf_future.cancel()
+                raise
             
             # Generate PDF (optional)
             pdf_bytes = None
             try:
-                pdf_bytes = self.generate_pdf(content_model)
+                pdf_bytes = pdf_future.result()
             except PDFGenerationError as e:
                 logger.warning(f"⚠️ PDF generation failed, continuing with DOCX only: {e}")
             
+            # Don't pin a DOCX-only result when the PDF failed; the next request should retry it
+            if pdf_bytes is not None or not self.pdf_engine:
+                self._output_cache_put(render_key, content_model, docx_bytes, pdf_bytes)
+            
             return content_model, docx_bytes, pdf_bytes
             
         except Exception as e:
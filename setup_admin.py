@@ -11,6 +11,7 @@ Usage:
 
 import os
 import sys
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
@@ -19,14 +20,17 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from db import get_db, engine
 from models import Base, AdminUser
-from utils.auth import AuthService
+from utils.auth import is_email_authorized, generate_password_hash
 
 load_dotenv()
 
 def create_tables():
     """Create database tables if they don't exist"""
     try:
-        Base.metadata.create_all(bind=engine)
+        # One introspection query instead of create_all's per-table existence checks
+        existing = set(inspect(engine).get_table_names())
+        if any(table.name not in existing for table in Base.metadata.sorted_tables):
+            Base.metadata.create_all(bind=engine)
         print("✅ Database tables created/verified")
         return True
     except Exception as e:
@@ -81,7 +85,7 @@ def setup_admin_user():
         is_superuser = input("Grant superuser privileges? (y/N): ").lower().strip() in ['y', 'yes']
         
         # Validate email authorization
-        if not AuthService.is_email_authorized(email):
+        if not is_email_authorized(email):
             print(f"\n⚠️  Warning: Email '{email}' is not in the authorized emails list")
             print("Current authorized emails:")
             authorized_emails = os.getenv("AUTHORIZED_EMAILS", "admin@example.com,qa@example.com").split(",")
@@ -98,14 +102,22 @@ def setup_admin_user():
         
         # Create the user
         try:
-            admin_user = AuthService.create_admin_user(
-                db=db,
+            existing_user = db.query(AdminUser).filter(
+                (AdminUser.email == email) | (AdminUser.username == username)
+            ).first()
+            if existing_user:
+                raise ValueError("An admin user with this email or username already exists")
+            
+            admin_user = AdminUser(
                 email=email,
                 username=username,
-                password=password,
+                password_hash=generate_password_hash(password),
                 full_name=full_name,
                 is_superuser=is_superuser
             )
+            db.add(admin_user)
+            db.commit()
+            db.refresh(admin_user)
             
             print(f"\n✅ Successfully created admin user!")
             print(f"   Email: {admin_user.email}")
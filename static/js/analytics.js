@@ -125,10 +125,10 @@ class AnalyticsDashboard {
         this.renderChart('pipeline-trends', {
             type: 'line',
             data: {
-                labels: data.map(d => d.date),
+                labels: data.ingested.dates,
                 datasets: [{
                     label: 'Opportunities',
-                    data: data.map(d => d.count),
+                    data: data.ingested.counts,
                     borderColor: '#3b82f6',
                     backgroundColor: 'rgba(59, 130, 246, 0.1)',
                     tension: 0.4
@@ -198,18 +198,18 @@ class AnalyticsDashboard {
         this.renderChart('security-trends', {
             type: 'line',
             data: {
-                labels: data.map(d => d.date),
+                labels: data.dates,
                 datasets: [
                     {
                         label: 'Login Success',
-                        data: data.filter(d => d.event_type === 'login_success').map(d => d.count),
+                        data: data.success,
                         borderColor: '#10b981',
                         backgroundColor: 'rgba(16, 185, 129, 0.1)',
                         tension: 0.4
                     },
                     {
                         label: 'Login Failure',
-                        data: data.filter(d => d.event_type === 'login_failure').map(d => d.count),
+                        data: data.failure,
                         borderColor: '#ef4444',
                         backgroundColor: 'rgba(239, 68, 68, 0.1)',
                         tension: 0.4
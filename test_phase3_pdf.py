@@ -34,7 +34,7 @@ def test_pdf_extractor_initialization():
     
     # Test with textract backend (mocked)
     with patch.dict(os.environ, {'OCR_BACKEND': 'textract'}):
-        with patch('builtins.__import__', side_effect=ImportError("boto3 not available")):
+        with patch('services.pdf_extract.find_spec', return_value=None):
             extractor = PDFExtractor()
             assert extractor.ocr_backend == "none"  # Should fallback
             print("✅ Textract fallback handled correctly")
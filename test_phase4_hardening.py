@@ -2,6 +2,7 @@ import unittest
 import tempfile
 import os
 import json
+import logging
 import yaml
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timedelta
@@ -311,6 +312,27 @@ class TestStructuredLogger(unittest.TestCase):
         # Should have logged start and completion
         # Note: In a real test, you'd capture and verify the logs
     
+    def test_strip_emoji_removes_misc_technical_symbols(self):
+        """Emoji prefixes from U+2300-U+23FF (such as ⏱) are stripped like the others"""
+        formatter = StructuredFormatter(strip_emoji=True)
+        record = logging.LogRecord("reqagent", logging.INFO, __file__, 1, "⏱️ Took 12ms ✅", None, None)
+        
+        self.assertEqual(json.loads(formatter.format(record))["message"], "Took 12ms")
+    
+    def test_operation_ids_do_not_wrap(self):
+        """Operation ids stay unique past 65,536 operations in one process"""
+        import itertools
+        import services.structured_logger as structured_logger
+        
+        with patch.object(structured_logger, "_op_counter", itertools.count(0xffff)):
+            with self.logger.timed_operation("first") as first_id:
+                pass
+            with self.logger.timed_operation("second") as second_id:
+                pass
+        
+        self.assertNotEqual(first_id, second_id)
+        self.assertTrue(second_id.endswith("10000"))
+    
     def test_specialized_logging_methods(self):
         """Test specialized logging methods"""
         with self.assertLogs('reqagent', level='INFO') as captured:
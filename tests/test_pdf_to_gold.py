@@ -0,0 +1,180 @@
+"""
+Tests for PDFToGoldParser configuration, rule-based field extraction and OpenAI request handling
+"""
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+import openai
+import pytest
+
+# Add project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_extract import ExtractResult
+from services.pdf_to_gold import PDFToGoldParser
+
+
+def _extract_result(text):
+    return ExtractResult(pages=1, text=text, blocks=[], confidence=0.9, engine="native-pymupdf",
+                         extraction_time_ms=1.0, ocr_used=False)
+
+
+def _record(title):
+    return {"title": title, "donor": "Example Foundation", "summary": "Support for local projects",
+            "amount": "$10,000", "deadline": "30 June 2024", "location": "Kenya",
+            "eligibility": ["NGOs"], "themes": ["Education"]}
+
+
+class FakeChatCompletion:
+    """Stands in for openai.ChatCompletion: returns (or raises) scripted replies and records each request"""
+
+    def __init__(self, replies, latency=0):
+        self.replies = list(replies)
+        self.requests = []
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _next(self, kwargs):
+        self.requests.append(kwargs)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        content = reply if isinstance(reply, str) else json.dumps(reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def create(self, **kwargs):
+        return self._next(kwargs)
+
+    async def acreate(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._next(kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def openai_parser(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.delenv("PDF_GOLD_CACHE", raising=False)
+    return PDFToGoldParser()
+
+
+def _install(monkeypatch, replies, latency=0):
+    fake = FakeChatCompletion(replies, latency)
+    monkeypatch.setattr(openai, "ChatCompletion", fake)
+    return fake
+
+
+def test_empty_parse_workers_uses_cpu_count(monkeypatch):
+    """env.example ships PDF_PARSE_WORKERS empty, which must not stop the parser from loading"""
+    monkeypatch.setenv("PDF_PARSE_WORKERS", "")
+
+    assert PDFToGoldParser().max_workers == (os.cpu_count() or 1)
+
+
+def test_parse_workers_below_one_rejected(monkeypatch):
+    monkeypatch.setenv("PDF_PARSE_WORKERS", "0")
+
+    with pytest.raises(ValueError):
+        PDFToGoldParser()
+
+
+def test_deadline_cue_beats_earlier_bare_date():
+    """A labelled deadline later in the text outranks a generic date near the top"""
+    parser = PDFToGoldParser()
+    text = (
+        "COMMUNITY GRANT OPPORTUNITY 2024\n"
+        "Published 1 March 2024 by the programme office\n"
+        + "Background and programme description.\n" * 60
+        + "Deadline: 30 June 2024\n"
+    )
+
+    opportunity = parser._parse_with_rules(text, _extract_result(text), "test.pdf")
+
+    assert opportunity.deadline == "30 June 2024"
+
+
+def test_batched_parse_splits_and_merges_in_order(monkeypatch, openai_parser):
+    """Documents are split into batch_size requests and each array item lands on its own document"""
+    openai_parser.batch_size = 2
+    fake = _install(monkeypatch, [[_record("Doc 0"), _record("Doc 1")], "```json\n" + json.dumps([_record("Doc 2")]) + "\n```"])
+    results = [_extract_result(f"Grant document number {i}") for i in range(3)]
+
+    opportunities = openai_parser.parse_many_to_gold_standard(results, ["a.pdf", "b.pdf", "c.pdf"])
+
+    assert [o.title for o in opportunities] == ["Doc 0", "Doc 1", "Doc 2"]
+    assert [o.opportunity_url for o in opportunities] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert len(fake.requests) == 2
+    assert "<<DOC 1>>\nGrant document number 1" in fake.requests[0]["messages"][1]["content"]
+    assert "response_format" not in fake.requests[0]
+
+
+@pytest.mark.parametrize("batch_reply", [
+    [_record("Doc 0")],  # fewer items than documents
+    "not json at all",
+    {"title": "one object, not an array"},
+])
+def test_batched_parse_falls_back_to_single_requests(monkeypatch, openai_parser, batch_reply):
+    """A batch reply that does not cover every document is discarded and each document is parsed alone"""
+    fake = _install(monkeypatch, [batch_reply, _record("Single 0"), _record("Single 1")])
+    results = [_extract_result(f"Grant document number {i}") for i in range(2)]
+
+    opportunities = openai_parser.parse_many_to_gold_standard(results)
+
+    assert [o.title for o in opportunities] == ["Single 0", "Single 1"]
+    assert len(fake.requests) == 3
+    assert all(request["response_format"] == {"type": "json_object"} for request in fake.requests[1:])
+
+
+def test_async_parse_respects_concurrency_limit(monkeypatch, openai_parser):
+    openai_parser.openai_concurrency = 2
+    fake = _install(monkeypatch, [_record(f"Doc {i}") for i in range(6)], latency=0.01)
+    results = [_extract_result(f"Grant document number {i}") for i in range(6)]
+
+    opportunities = asyncio.run(openai_parser.parse_many_async(results))
+
+    assert len(opportunities) == 6
+    assert fake.max_in_flight == 2
+
+
+def test_async_call_backs_off_on_transient_errors(monkeypatch, openai_parser):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("services.pdf_to_gold.asyncio.sleep", fake_sleep)
+    fake = _install(monkeypatch, [openai.error.RateLimitError("slow down"), openai.error.Timeout("timed out"), _record("Doc")])
+
+    parsed = asyncio.run(openai_parser._complete_json_async("prompt", max_tokens=100))
+
+    assert parsed["title"] == "Doc"
+    assert len(fake.requests) == 3
+    assert delays == [openai_parser.openai_retry_delay, openai_parser.openai_retry_delay * 2]
+
+
+def test_async_call_gives_up_after_max_retries(monkeypatch, openai_parser):
+    openai_parser.openai_max_retries = 1
+    openai_parser.openai_retry_delay = 0
+    fake = _install(monkeypatch, [openai.error.RateLimitError("slow down")] * 2)
+
+    with pytest.raises(openai.error.RateLimitError):
+        asyncio.run(openai_parser._complete_json_async("prompt", max_tokens=100))
+    assert len(fake.requests) == 2
+
+
+def test_async_call_retries_invalid_json_with_feedback(monkeypatch, openai_parser):
+    fake = _install(monkeypatch, ["{not valid", _record("Doc")])
+
+    parsed = asyncio.run(openai_parser._complete_json_async("prompt", max_tokens=100))
+
+    assert parsed["title"] == "Doc"
+    assert fake.requests[1]["messages"][-2] == {"role": "assistant", "content": "{not valid"}
+    assert "not valid JSON" in fake.requests[1]["messages"][-1]["content"]
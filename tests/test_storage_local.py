@@ -0,0 +1,148 @@
+"""
+Tests for the local storage backend's bulk existence checks, streaming saves and memory-mapped reads
+"""
+import io
+import os
+import sys
+import threading
+import pytest
+
+# Add project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.storage import StorageService, StorageError
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    for name in ("S3_ENDPOINT", "S3_BUCKET", "S3_ACCESS_KEY", "S3_SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("REQAGENT_STORAGE_DIR", str(tmp_path / "storage"))
+    service = StorageService()
+    assert service.backend_type == "local"
+    return service
+
+
+def test_exists_many_matches_exists(storage):
+    """One directory listing per folder gives the same answers as exists()"""
+    storage.save_bytes("docs/a.txt", b"a")
+    storage.save_bytes("docs/b.txt", b"b")
+    storage.save_bytes("other/c.txt", b"c")
+    paths = ["docs/a.txt", "docs/b.txt", "docs/missing.txt", "other/c.txt", "nowhere/d.txt"]
+
+    result = storage.exists_many(paths)
+
+    assert result == {
+        "docs/a.txt": True,
+        "docs/b.txt": True,
+        "docs/missing.txt": False,
+        "other/c.txt": True,
+        "nowhere/d.txt": False,
+    }
+    assert result == {path: storage.exists(path) for path in paths}
+    assert storage.exists_many([]) == {}
+
+
+def test_save_stream_regular_file_from_current_position(storage, tmp_path):
+    """Regular files take the sendfile path and copy from the current offset"""
+    src_path = tmp_path / "src.bin"
+    src_path.write_bytes(b"header" + os.urandom(256 * 1024))
+
+    with open(src_path, "rb") as src:
+        src.seek(6)
+        storage.save_stream("streams/file.bin", src)
+        assert src.tell() == src_path.stat().st_size
+
+    assert storage.open("streams/file.bin") == src_path.read_bytes()[6:]
+
+
+def test_save_stream_bytesio(storage):
+    """In-memory file objects fall back to a buffered copy"""
+    data = os.urandom(100_000)
+
+    storage.save_stream("streams/memory.bin", io.BytesIO(data))
+
+    assert storage.open("streams/memory.bin") == data
+
+
+def test_save_stream_pipe(storage):
+    """Pipes are not seekable, so they must not go through sendfile"""
+    data = os.urandom(300_000)
+    read_fd, write_fd = os.pipe()
+
+    def feed():
+        with open(write_fd, "wb") as w:
+            w.write(data)
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    with open(read_fd, "rb") as src:
+        storage.save_stream("streams/pipe.bin", src)
+    writer.join()
+
+    assert storage.open("streams/pipe.bin") == data
+
+
+def test_save_stream_failure_removes_partial_file(storage):
+    """A source that fails part-way leaves no truncated file behind"""
+    class FailingSource:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size=-1):
+            self.calls += 1
+            if self.calls > 1:
+                raise OSError("connection reset")
+            return b"partial data"
+
+    with pytest.raises(StorageError):
+        storage.save_stream("streams/broken.bin", FailingSource())
+
+    assert not storage.exists("streams/broken.bin")
+
+
+def test_save_path_copies_file(storage, tmp_path):
+    src_path = tmp_path / "upload.pdf"
+    src_path.write_bytes(b"%PDF-1.4 " + os.urandom(64 * 1024))
+
+    full_path = storage.save_path(str(src_path), "uploads/copy.pdf")
+
+    assert full_path == os.path.join(str(storage.base_path), "uploads", "copy.pdf")
+    assert storage.open("uploads/copy.pdf") == src_path.read_bytes()
+    assert src_path.exists()
+
+
+def test_save_path_missing_source_raises(storage, tmp_path):
+    with pytest.raises(StorageError):
+        storage.save_path(str(tmp_path / "missing.pdf"), "uploads/missing.pdf")
+
+
+def test_open_mmap_returns_file_contents(storage):
+    data = os.urandom((1 << 20) + 123)
+    storage.save_bytes("mapped/large.bin", data)
+
+    view = storage.open_mmap("mapped/large.bin")
+
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert bytes(view[:16]) == data[:16]
+    assert view.tobytes() == data
+    assert storage.open("mapped/large.bin") == data
+    view.release()
+
+
+def test_open_mmap_empty_and_missing(storage):
+    storage.save_bytes("mapped/empty.bin", b"")
+
+    assert storage.open_mmap("mapped/empty.bin").tobytes() == b""
+    with pytest.raises(StorageError):
+        storage.open_mmap("mapped/missing.bin")
+
+
+def test_list_files_does_not_follow_directory_symlinks(storage):
+    """A symlink cycle neither recurses forever nor hides the real files"""
+    storage.save_bytes("tree/a.txt", b"a")
+    storage.save_bytes("tree/sub/b.txt", b"b")
+    os.symlink(os.path.join(str(storage.base_path), "tree"), os.path.join(str(storage.base_path), "tree", "sub", "loop"))
+
+    assert sorted(storage.list_files("tree")) == ["tree/a.txt", "tree/sub/b.txt"]
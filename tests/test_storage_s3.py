@@ -0,0 +1,135 @@
+"""
+Tests for the S3 backend's bulk existence checks and upload dedupe against an in-memory stand-in for the S3 client
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+import pytest
+from botocore.exceptions import ClientError
+
+# Add project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.storage import StorageService, EXISTS_MANY_LIST_MIN_KEYS
+
+
+class FakeS3Client:
+    """The subset of the boto3 S3 client StorageService uses, backed by a dict; records every call"""
+
+    def __init__(self, keys=()):
+        self.objects = {key: b"" for key in keys}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, name, **kwargs):
+        with self._lock:
+            self.calls.append((name, kwargs))
+
+    def calls_to(self, name):
+        return [kwargs for call, kwargs in self.calls if call == name]
+
+    def head_object(self, Bucket, Key):
+        self._record("head_object", Key=Key)
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[Key]), "ETag": self._etag(self.objects[Key])}
+
+    @staticmethod
+    def _etag(data):
+        return '"%s"' % hashlib.md5(data).hexdigest()
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._record("put_object", Key=Key)
+        self.objects[Key] = Body
+        return {"ETag": self._etag(Body)}
+
+    def delete_object(self, Bucket, Key):
+        self._record("delete_object", Key=Key)
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix="", Delimiter=None):
+        self._record("list_objects_v2", Prefix=Prefix, Delimiter=Delimiter)
+        contents = []
+        for key in sorted(self.objects):
+            if not key.startswith(Prefix):
+                continue
+            if Delimiter and Delimiter in key[len(Prefix):]:
+                continue
+            contents.append({"Key": key})
+        yield {"Contents": contents}
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    for name in ("S3_ENDPOINT", "S3_BUCKET", "S3_ACCESS_KEY", "S3_SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("REQAGENT_STORAGE_DIR", str(tmp_path / "storage"))
+    service = StorageService()
+    service.backend_type = "s3"
+    service.s3_bucket = "bucket"
+    service._encryption_checked_at = time.monotonic()
+    return service
+
+
+def test_exists_many_unrelated_keys_use_head_not_bucket_listing(storage):
+    """Keys with no common directory (empty common prefix) must never list the whole bucket"""
+    storage.s3_client = FakeS3Client(["a.txt", "docs/b.txt"] + [f"bulk/{i}.txt" for i in range(50)])
+
+    result = storage.exists_many(["a.txt", "missing.txt", "docs/b.txt"])
+
+    assert result == {"a.txt": True, "missing.txt": False, "docs/b.txt": True}
+    assert storage.s3_client.calls_to("list_objects_v2") == []
+    assert sorted(call["Key"] for call in storage.s3_client.calls_to("head_object")) == ["a.txt", "docs/b.txt", "missing.txt"]
+
+
+def test_exists_many_lists_each_large_directory_with_delimiter(storage):
+    keys = [f"docs/{i}.pdf" for i in range(EXISTS_MANY_LIST_MIN_KEYS)]
+    storage.s3_client = FakeS3Client(keys[1:] + ["docs/nested/x.pdf", "other/y.pdf"])
+
+    result = storage.exists_many(keys + ["other/y.pdf"])
+
+    assert result == {**{key: key != "docs/0.pdf" for key in keys}, "other/y.pdf": True}
+    assert storage.s3_client.calls_to("list_objects_v2") == [{"Prefix": "docs/", "Delimiter": "/"}]
+    assert [call["Key"] for call in storage.s3_client.calls_to("head_object")] == ["other/y.pdf"]
+    assert storage.exists_many([]) == {}
+
+
+def test_identical_save_skips_upload(storage):
+    storage.s3_client = FakeS3Client()
+
+    storage.save_bytes("docs/a.txt", b"same")
+    storage.save_bytes("docs/a.txt", b"same")
+
+    assert len(storage.s3_client.calls_to("put_object")) == 1
+
+
+def test_save_delete_save_uploads_again(storage):
+    storage.s3_client = FakeS3Client()
+
+    storage.save_bytes("docs/a.txt", b"data")
+    storage.delete("docs/a.txt")
+    storage.save_bytes("docs/a.txt", b"data")
+
+    assert storage.s3_client.objects["docs/a.txt"] == b"data"
+    assert len(storage.s3_client.calls_to("put_object")) == 2
+
+
+def test_save_after_other_writer_changed_object_uploads_again(storage):
+    """The in-process record must not hide a delete or overwrite made by another worker"""
+    storage.s3_client = FakeS3Client()
+
+    storage.save_bytes("docs/a.txt", b"data")
+    storage.s3_client.objects.pop("docs/a.txt")
+    storage.save_bytes("docs/a.txt", b"data")
+    assert storage.s3_client.objects["docs/a.txt"] == b"data"
+
+    storage.s3_client.objects["docs/a.txt"] = b"other"
+    storage.save_bytes("docs/a.txt", b"data")
+    assert storage.s3_client.objects["docs/a.txt"] == b"data"
+    assert len(storage.s3_client.calls_to("put_object")) == 3
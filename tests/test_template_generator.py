@@ -0,0 +1,80 @@
+"""
+Tests for the proposal template generator's output cache and PDF streaming
+"""
+import os
+import sys
+import pytest
+
+# Add project root to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.template_generator import ProposalTemplateGenerator, _PDFChunkSink
+
+OPPORTUNITY = {"title": "Clean Water Grant", "donor": "Example Foundation", "themes": ["water", "health"]}
+
+
+@pytest.fixture
+def generator():
+    gen = ProposalTemplateGenerator()
+    gen.pdf_engine = "reportlab"
+    return gen
+
+
+def test_generate_template_reuses_cached_output(generator):
+    """Identical content is served from the output cache"""
+    first = generator.generate_template(OPPORTUNITY, [], "Notes")
+    second = generator.generate_template(OPPORTUNITY, [], "Notes")
+    
+    assert second[0] is first[0]
+    assert second[1] is first[1]
+    assert second[2] is first[2]
+
+
+def test_generate_template_use_cache_false_renders_fresh(generator):
+    """use_cache=False (force regenerate) bypasses the cache and refreshes it"""
+    first = generator.generate_template(OPPORTUNITY, [], "Notes")
+    forced = generator.generate_template(OPPORTUNITY, [], "Notes", use_cache=False)
+    
+    assert forced[0] is not first[0]
+    assert forced[1] is not first[1]
+    assert forced[2].startswith(b"%PDF-")
+    
+    # The fresh result replaces the cached one
+    again = generator.generate_template(OPPORTUNITY, [], "Notes")
+    assert again[0] is forced[0]
+
+
+def test_generate_pdf_stream_yields_complete_pdf(generator):
+    """Streamed chunks join into a whole PDF the same size as generate_pdf() output"""
+    content_model = generator.build_content_model(OPPORTUNITY, [], "Notes", generated_at="2024-01-01T00:00:00")
+    
+    chunks = list(generator.generate_pdf_stream(content_model))
+    streamed = b"".join(chunks)
+    
+    assert chunks and all(isinstance(chunk, bytes) for chunk in chunks)
+    assert streamed.startswith(b"%PDF-")
+    assert streamed.rstrip().endswith(b"%%EOF")
+    # ReportLab stamps creation time and a document id, so compare size rather than bytes
+    assert abs(len(streamed) - len(generator.generate_pdf(content_model))) < 64
+
+
+def test_generate_pdf_stream_without_engine_returns_none(generator):
+    content_model = generator.build_content_model(OPPORTUNITY, [], "Notes")
+    generator.pdf_engine = None
+    
+    assert generator.generate_pdf_stream(content_model) is None
+    assert generator.generate_pdf(content_model) is None
+
+
+def test_pdf_chunk_sink_drains_in_write_order():
+    """The sink keeps writes as separate chunks and releases each one as it is consumed"""
+    sink = _PDFChunkSink()
+    sink.write(b"%PDF-")
+    sink.write(memoryview(b"1.4\n"))
+    
+    assert sink.size == 9
+    drained = sink.drain()
+    assert next(drained) == b"%PDF-"
+    assert len(sink._chunks) == 1
+    assert list(drained) == [b"1.4\n"]
+    assert not sink._chunks
@@ -14,8 +14,18 @@ logger = logging.getLogger(__name__)
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@example.com")
 ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH", "")
 
+def parse_email_list(value: str) -> frozenset:
+    """
+    Parse a comma-separated email list into a set of stripped, lowercased addresses
+    """
+    return frozenset(e.strip().lower() for e in value.split(",") if e.strip())
+
+# Emails allowed to hold admin accounts, normalized once for O(1) lookups
+AUTHORIZED_EMAILS = parse_email_list(os.getenv("AUTHORIZED_EMAILS", "admin@example.com,qa@example.com"))
+
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # bcrypt's default cost; tests set 4
 
 def verify_admin_credentials(email: str, password: str) -> bool:
     """
@@ -44,6 +54,12 @@ def verify_admin_credentials(email: str, password: str) -> bool:
         logger.error(f"Error during credential verification: {e}")
         return False
 
+def is_email_authorized(email: str) -> bool:
+    """
+    Check if an email is in the AUTHORIZED_EMAILS list (case-insensitive)
+    """
+    return email.strip().lower() in AUTHORIZED_EMAILS
+
 def is_logged_in(request: Request) -> bool:
     """
     Check if user is logged in by checking session
@@ -120,7 +136,7 @@ def generate_password_hash(password: str) -> str:
     """
     Generate bcrypt hash for a password - use this to create ADMIN_PASSWORD_HASH
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 